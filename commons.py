@@ -13,138 +13,47 @@ def getCurrentTimeStamp():
     """
     return datetime.now().isoformat(timespec="seconds")
 
-def isJoinable(type, date):
+def getTimeStampFromUnixTime(unixTime):
     """
-    Checks if a session is joinable based on its type and date.
+    Converts a Unix time sent by a device into the timestamp format used by the session events.
 
     Parameters:
-        type (str): The type of the session (e.g., "joinable").
-        date (str): The date of the session in the format "dd-mm-yyyy".
+        unixTime (int): Seconds since the Unix epoch.
 
     Returns:
-        bool: True if the session is joinable, False otherwise.
+        str: The same instant in ISO format, local time (e.g., "2023-10-31T15:17:12").
 
     Example:
-        joinable = isJoinable("joinable", "15-10-2023")
+        timestamp = getTimeStampFromUnixTime(1698765432)
     """
-    return type == "joinable" and userCanJoin(date)
+    return datetime.fromtimestamp(unixTime).isoformat(timespec="seconds")
 
-def isPrevious(type, date):
+def getTodayDate():
     """
-    Checks if a session is a previous session based on its type and date.
-
-    Parameters:
-        type (str): The type of the session (e.g., "previous").
-        date (str): The date of the session in the format "dd-mm-yyyy".
-
-    Returns:
-        bool: True if the session is a previous session, False otherwise.
-
-    Example:
-        previous = isPrevious("previous", "15-10-2023")
-    """
-    return type == "previous" and userCanSeeSummary(date)
-
-def isSignOut(type, date):
-    """
-    Checks if a session allows sign-out based on its type and date.
-
-    Parameters:
-        type (str): The type of the session (e.g., "signed").
-        date (str): The date of the session in the format "dd-mm-yyyy".
+    Generates today's date in a sortable format.
 
     Returns:
-        bool: True if the session allows sign-out, False otherwise.
+        str: A string representing today's date in ISO format (e.g., "2023-10-15").
 
     Example:
-        sign_out = isSignOut("signed", "15-10-2023")
+        today = getTodayDate()
     """
-    return type == "signed" and userSignOut(date)
+    return datetime.today().date().isoformat()
 
-def userCanJoin(dateStr):
+def toSortableDate(dateStr):
     """
-    Checks if a user can join a session based on the session date.
+    Converts a session date into a sortable format.
 
     Parameters:
         dateStr (str): The date of the session in the format "dd-mm-yyyy".
 
     Returns:
-        bool: True if the session date is today, False otherwise.
-
-    Example:
-        can_join = userCanJoin("15-10-2023")
-    """
-    date = datetime.strptime(dateStr, "%d-%m-%Y")
-    today = datetime.today().date()
-    return date.date() == today
-
-def userCanSeeSummary(date_str):
-    """
-    Checks if a user can see the summary of a session based on the session date.
-
-    Parameters:
-        date_str (str): The date of the session in the format "dd-mm-yyyy".
-
-    Returns:
-        bool: True if the session date is today or in the past, False otherwise.
-
-    Example:
-        can_see_summary = userCanSeeSummary("15-10-2023")
-    """
-    date = datetime.strptime(date_str, "%d-%m-%Y")
-    today = datetime.today().date()
-    return date.date() <= today
-
-def userSignOut(date_str):
-    """
-    Checks if a user can sign out of a session based on the session date.
-
-    Parameters:
-        date_str (str): The date of the session in the format "dd-mm-yyyy".
-
-    Returns:
-        bool: True if the session date is in the future, False otherwise.
-
-    Example:
-        can_sign_out = userSignOut("15-10-2023")
-    """
-    date = datetime.strptime(date_str, "%d-%m-%Y")
-    today = datetime.today().date()
-    return date.date() > today
-
-def isPastDate(date_str):
-    """
-    Checks if a date is in the past.
-
-    Parameters:
-        date_str (str): The date to check in the format "dd-mm-yyyy".
-
-    Returns:
-        bool: True if the date is in the past, False otherwise.
-
-    Example:
-        past = isPastDate("15-10-2023")
-    """
-    date = datetime.strptime(date_str, "%d-%m-%Y")
-    today = datetime.today().date()
-    return date.date() < today
-
-def isToday(date_str):
-    """
-    Checks if a date is today.
-
-    Parameters:
-        date_str (str): The date to check in the format "dd-mm-yyyy".
-
-    Returns:
-        bool: True if the date is today, False otherwise.
+        str: The same date in ISO format (e.g., "2023-10-15").
 
     Example:
-        today = isToday("15-10-2023")
+        sortable_date = toSortableDate("15-10-2023")
     """
-    date = datetime.strptime(date_str, "%d-%m-%Y")
-    today = datetime.today().date()
-    return date.date() == today
+    return datetime.strptime(dateStr, "%d-%m-%Y").date().isoformat()
 
 def getUserAgeFromDate(date):
     """
@@ -197,4 +106,4 @@ def isValidBirthdate(user):
         birth_date = datetime(user.birthYear, user.birthMonth, user.birthDay)
         return birth_date < datetime.now()
     except ValueError:
-        return False
\ No newline at end of file
+        return False
@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Accepted heart rates (BPM) and sample timestamps (Unix time in seconds, up to 2100-01-01)
+MIN_HEART_RATE = 1
+MAX_HEART_RATE = 300
+MAX_UNIX_TIME = 4102444800
 
 # Data Types
 
@@ -119,8 +125,8 @@ class HeartbeatInfo(BaseModel):
     **Fields:**
     - `sessionId` (string): The ID of the session.
     - `username` (string): The user's username.
-    - `heartRate` (int): The user's heart rate (BPM).
-    - `timeStamp` (int): The timestamp of the heartbeat data.
+    - `heartRate` (int): The user's heart rate (BPM), between 1 and 300.
+    - `timeStamp` (int): The timestamp of the heartbeat data (Unix time in seconds).
 
     **Example:**
     ```json
@@ -134,8 +140,99 @@ class HeartbeatInfo(BaseModel):
     """
     sessionId: str
     username: str
-    heartRate: int
-    timeStamp: int
+    heartRate: int = Field(ge=MIN_HEART_RATE, le=MAX_HEART_RATE)
+    timeStamp: int = Field(ge=0, le=MAX_UNIX_TIME)
+
+
+class HeartbeatSample(BaseModel):
+    """
+    Model for one heart rate sample of a batch.
+
+    **Fields:**
+    - `timeStamp` (int): The timestamp of the sample (Unix time in seconds).
+    - `heartRate` (int): The user's heart rate (BPM), between 1 and 300.
+
+    **Example:**
+    ```json
+    {
+      "timeStamp": 1698765432,
+      "heartRate": 72
+    }
+    ```
+    """
+    timeStamp: int = Field(ge=0, le=MAX_UNIX_TIME)
+    heartRate: int = Field(ge=MIN_HEART_RATE, le=MAX_HEART_RATE)
+
+
+class HeartbeatBatch(BaseModel):
+    """
+    Model for a batch of heart rate samples of one user in a session.
+
+    **Fields:**
+    - `sessionId` (string): The ID of the session.
+    - `username` (string): The user's username.
+    - `samples` (list): Between 1 and 1000 `HeartbeatSample` objects, oldest first.
+
+    **Example:**
+    ```json
+    {
+      "sessionId": "1",
+      "username": "example123",
+      "samples": [
+        {"timeStamp": 1698765432, "heartRate": 72},
+        {"timeStamp": 1698765433, "heartRate": 74}
+      ]
+    }
+    ```
+    """
+    sessionId: str
+    username: str
+    samples: List[HeartbeatSample] = Field(min_length=1, max_length=1000)
+
+
+class DeviceAuthentication(BaseModel):
+    """
+    Model for the first message of a device ingestion WebSocket.
+
+    **Fields:**
+    - `username` (string): The user's username.
+    - `deviceToken` (string): The token received at login.
+    - `sessionId` (string): The ID of the session the samples belong to.
+
+    **Example:**
+    ```json
+    {
+      "username": "example123",
+      "deviceToken": "abc123xyz",
+      "sessionId": "1"
+    }
+    ```
+    """
+    username: str
+    deviceToken: str
+    sessionId: str
+
+
+class DeviceSample(BaseModel):
+    """
+    Model for a text frame of a device ingestion WebSocket, holding a heart rate, an HRV value or both.
+
+    **Fields:**
+    - `heartRate` (int, optional): The user's heart rate (BPM), between 1 and 300.
+    - `timeStamp` (int, optional): The timestamp of the heart rate (Unix time in seconds). Defaults to the time of arrival.
+    - `hrv` (int, optional): The user's HRV value (ms).
+
+    **Example:**
+    ```json
+    {
+      "heartRate": 72,
+      "timeStamp": 1698765432
+    }
+    ```
+    """
+    heartRate: Optional[int] = Field(default=None, ge=MIN_HEART_RATE, le=MAX_HEART_RATE)
+    timeStamp: Optional[int] = Field(default=None, ge=0, le=MAX_UNIX_TIME)
+    hrv: Optional[int] = None
 
 
 class HRVInfo(BaseModel):
@@ -161,6 +258,60 @@ class HRVInfo(BaseModel):
     hrv: int
 
 
+class RRIntervals(BaseModel):
+    """
+    Model for a series of RR intervals of a user in a session.
+
+    **Fields:**
+    - `sessionId` (string): The ID of the session.
+    - `username` (string): The user's username.
+    - `intervals` (list): Between 2 and 10000 RR intervals in milliseconds, oldest first.
+    - `window` (int, optional): Number of successive differences per rolling RMSSD value (default 30).
+
+    **Example:**
+    ```json
+    {
+      "sessionId": "1",
+      "username": "example123",
+      "intervals": [812, 845, 790, 830, 801]
+    }
+    ```
+    """
+    sessionId: str
+    username: str
+    intervals: List[float] = Field(min_length=2, max_length=10000)
+    window: int = Field(default=30, ge=2, le=1000)
+
+
+class HRVMetrics(BaseModel):
+    """
+    Model for the time-domain HRV metrics computed from RR intervals.
+
+    **Fields:**
+    - `rmssd` (float): Root mean square of the successive differences (ms).
+    - `sdnn` (float): Standard deviation of the intervals (ms).
+    - `pnn50` (float): Percentage of successive differences larger than 50 ms.
+    - `meanRR` (float): Average interval (ms).
+    - `rollingRmssd` (list): RMSSD of each window of successive differences, oldest first.
+
+    **Example:**
+    ```json
+    {
+      "rmssd": 40.48,
+      "sdnn": 22.1,
+      "pnn50": 25.0,
+      "meanRR": 815.6,
+      "rollingRmssd": []
+    }
+    ```
+    """
+    rmssd: float
+    sdnn: float
+    pnn50: float
+    meanRR: float
+    rollingRmssd: List[float]
+
+
 class Session(BaseModel):
     """
     Model for a session.
@@ -272,8 +423,9 @@ class SessionSummaryData(BaseModel):
     **Fields:**
     - `username` (string): The user's username.
     - `sessionId` (string): The ID of the session.
-    - `measurements` (list): A list of measurements taken during the session.
-    - `hrv` (int): The user's HRV value.
+    - `measurements` (list, optional): A list of measurements taken during the session. When empty,
+      the summary is computed from the samples the server received.
+    - `hrv` (int, optional): The user's HRV value. Defaults to the last HRV value the server received.
 
     **Example:**
     ```json
@@ -288,7 +440,7 @@ class SessionSummaryData(BaseModel):
     username: str
     sessionId: str
     measurements: list = []
-    hrv: int
+    hrv: Optional[int] = None
 
 
 class PreviousSessionData(BaseModel):
@@ -554,4 +706,94 @@ class SSEData(BaseModel):
     username: str
     timeStamp: str
     event: str
-    value: str = ""
\ No newline at end of file
+    value: str = ""
+
+
+class SSEStats(BaseModel):
+    """
+    Model for the counters of the session event broker.
+
+    **Fields:**
+    - `subscribers` (int): The number of open event streams.
+    - `droppedEvents` (int): Events discarded because a subscriber's buffer was full.
+    - `coalescedEvents` (int): Events merged into a newer event of the same user and type.
+    - `evictedSubscribers` (int): Subscribers disconnected because their buffer was full.
+    - `expiredSubscribers` (int): Subscribers disconnected after their idle or maximum lifetime.
+
+    **Example:**
+    ```json
+    {
+      "subscribers": 3,
+      "droppedEvents": 120,
+      "coalescedEvents": 4500,
+      "evictedSubscribers": 1,
+      "expiredSubscribers": 12
+    }
+    ```
+    """
+    subscribers: int
+    droppedEvents: int
+    coalescedEvents: int
+    evictedSubscribers: int
+    expiredSubscribers: int
+
+
+class LiveParticipant(BaseModel):
+    """
+    Model for the live state of a participant in a session.
+
+    **Fields:**
+    - `username` (string): The user's username.
+    - `handle` (int): The number identifying the user in the binary frames of the dashboard WebSocket.
+    - `name` (string, optional): The user's first name, known once the user entered the session.
+    - `heartRate` (int, optional): The last heart rate received (BPM).
+    - `hrv` (float, optional): The last HRV value received (ms).
+    - `timeStamp` (string, optional): The timestamp of the last event received from the user.
+
+    **Example:**
+    ```json
+    {
+      "username": "username123",
+      "handle": 1,
+      "name": "John",
+      "heartRate": 72,
+      "hrv": 50,
+      "timeStamp": "2023-10-15T10:00:00"
+    }
+    ```
+    """
+    username: str
+    handle: int
+    name: Optional[str] = None
+    heartRate: Optional[int] = None
+    hrv: Optional[float] = None
+    timeStamp: Optional[str] = None
+
+
+class LiveSessionSnapshot(BaseModel):
+    """
+    Model for the live state of a session.
+
+    **Fields:**
+    - `sessionId` (string): The ID of the session.
+    - `participants` (list): The users currently in the session, as `LiveParticipant` objects.
+
+    **Example:**
+    ```json
+    {
+      "sessionId": "1",
+      "participants": [
+        {
+          "username": "username123",
+          "handle": 1,
+          "name": "John",
+          "heartRate": 72,
+          "hrv": 50,
+          "timeStamp": "2023-10-15T10:00:00"
+        }
+      ]
+    }
+    ```
+    """
+    sessionId: str
+    participants: List[LiveParticipant]
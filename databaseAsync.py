@@ -0,0 +1,55 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from databaseConnectionPool import *
+
+# Threads running blocking database calls for async route handlers. Kept at the pool size so
+# every worker can always get a connection without waiting on the pool.
+DATABASE_EXECUTOR_WORKERS = POOL_SIZE
+
+databaseExecutor = None
+
+def getDatabaseExecutor():
+    """
+    Returns the bounded executor used for database calls, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The executor running blocking database calls.
+
+    Example:
+        executor = getDatabaseExecutor()
+    """
+    global databaseExecutor
+    if databaseExecutor is None:
+        databaseExecutor = ThreadPoolExecutor(max_workers=DATABASE_EXECUTOR_WORKERS, thread_name_prefix="database")
+    return databaseExecutor
+
+async def runDatabaseCall(function, *args, **kwargs):
+    """
+    Runs a blocking database function on the database executor without blocking the event loop.
+
+    Parameters:
+        function (callable): The blocking function to run (e.g., `searchForUserDetails`).
+        *args: Positional arguments passed to the function.
+        **kwargs: Keyword arguments passed to the function.
+
+    Returns:
+        Any: The value returned by the function.
+
+    Example:
+        user = await runDatabaseCall(searchForUserDetails, "example123")
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(getDatabaseExecutor(), functools.partial(function, *args, **kwargs))
+
+def shutdownDatabaseExecutor():
+    """
+    Waits for pending database calls to finish and stops the database executor.
+
+    Example:
+        shutdownDatabaseExecutor()
+    """
+    global databaseExecutor
+    if databaseExecutor is not None:
+        databaseExecutor.shutdown(wait=True)
+        databaseExecutor = None
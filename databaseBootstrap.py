@@ -0,0 +1,61 @@
+import logging
+from databaseConnectionPool import *
+from databaseMigrations import *
+
+logger = logging.getLogger('uvicorn.error')
+
+def applyDatabasePragmas(connection, profile=DATABASE_PROFILE):
+    """
+    Applies the database-wide PRAGMAs of a profile (e.g., the WAL journal mode) to a database file.
+
+    Parameters:
+        connection (sqlite3.Connection): An open connection to the database.
+        profile (str): The name of a profile in `DATABASE_PROFILES`.
+
+    Example:
+        applyDatabasePragmas(sqlite3.connect("HeartRateMonitoring.sqlite3"), "durable")
+    """
+    for name in DATABASE_PRAGMAS:
+        if name in DATABASE_PROFILES[profile]:
+            connection.execute(f"PRAGMA {name} = {DATABASE_PROFILES[profile][name]}").fetchall()
+
+def getActiveDatabaseSettings():
+    """
+    Reads the PRAGMA values in effect on a pooled connection.
+
+    Returns:
+        dict: The schema version (`user_version`) and the value of every PRAGMA of the active profile.
+
+    Example:
+        settings = getActiveDatabaseSettings()
+        print(settings["journal_mode"])  # Output: wal
+    """
+    connection = acquireConnection()
+    try:
+        settings = {"user_version": getSchemaVersion(connection)}
+        for name in DATABASE_PROFILES[DATABASE_PROFILE]:
+            settings[name] = connection.execute(f"PRAGMA {name}").fetchone()[0]
+        return settings
+    finally:
+        releaseConnection(connection)
+
+def bootstrapDatabase():
+    """
+    Prepares the database for the server: applies the database-wide PRAGMAs of the active
+    profile, runs the pending migrations and logs the settings in effect.
+
+    Returns:
+        dict: The schema version and the value of every PRAGMA of the active profile.
+
+    Example:
+        settings = bootstrapDatabase()
+    """
+    connection = connectionPool.createConnection()
+    try:
+        applyDatabasePragmas(connection)
+    finally:
+        connection.close()
+    migrateDatabase()
+    settings = getActiveDatabaseSettings()
+    logger.info(f"Database profile '{DATABASE_PROFILE}': {settings}")
+    return settings
@@ -0,0 +1,238 @@
+import sqlite3
+import threading
+import queue
+
+DATABASE_PATH = "HeartRateMonitoring.sqlite3"
+
+# Maximum number of connections kept open by the process-wide pool
+POOL_SIZE = 8
+
+# Seconds a thread waits for a free connection before giving up
+POOL_TIMEOUT = 10
+
+# PRAGMA profiles for the database. `journal_mode` is stored in the database file and set once
+# at bootstrap, every other PRAGMA is applied to each connection when it is created.
+DATABASE_PROFILES = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 10000,
+    },
+}
+
+# Profile used by the server
+DATABASE_PROFILE = "performance"
+
+# PRAGMAs that belong to the database file rather than to a connection
+DATABASE_PRAGMAS = ("journal_mode",)
+
+def getConnectionPragmas(profile=DATABASE_PROFILE):
+    """
+    Returns the PRAGMAs of a profile that are applied to every new connection.
+
+    Parameters:
+        profile (str): The name of a profile in `DATABASE_PROFILES`.
+
+    Returns:
+        dict: PRAGMA names and values.
+
+    Example:
+        pragmas = getConnectionPragmas("durable")
+    """
+    return {name: value for name, value in DATABASE_PROFILES[profile].items() if name not in DATABASE_PRAGMAS}
+
+class ConnectionPool:
+    """
+    A thread-safe pool of reusable SQLite connections.
+
+    Connections are created lazily up to `size`, configured once with `pragmas` and
+    health-checked every time they are handed out. A thread that already holds a
+    connection gets the same one back on nested checkouts, so helpers that call other
+    query functions never wait on themselves.
+
+    Parameters:
+        databasePath (str): The path of the SQLite database file.
+        size (int): The maximum number of open connections.
+        timeout (float): Seconds to wait for a free connection.
+        pragmas (dict): PRAGMA names and values applied to each new connection (defaults to the active profile).
+
+    Example:
+        pool = ConnectionPool("HeartRateMonitoring.sqlite3", size=4)
+        connection = pool.acquire()
+        try:
+            connection.execute("SELECT 1")
+        finally:
+            pool.release(connection)
+    """
+    def __init__(self, databasePath=DATABASE_PATH, size=POOL_SIZE, timeout=POOL_TIMEOUT, pragmas=None):
+        self.databasePath = databasePath
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(getConnectionPragmas() if pragmas is None else pragmas)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def createConnection(self):
+        """
+        Opens a new connection to the database and applies the configured PRAGMAs.
+
+        Returns:
+            sqlite3.Connection: The configured connection.
+        """
+        connection = sqlite3.connect(self.databasePath, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def acquire(self):
+        """
+        Checks out a connection for the current thread.
+
+        Returns:
+            sqlite3.Connection: A healthy connection owned by the current thread until released.
+
+        Raises:
+            sqlite3.OperationalError: If the pool is closed or no connection becomes available within the pool timeout.
+        """
+        if self._closed:
+            raise sqlite3.OperationalError("Connection pool is closed")
+        held = getattr(self._local, "connection", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+        connection = self._checkout()
+        self._local.connection = connection
+        self._local.depth = 1
+        return connection
+
+    def release(self, connection):
+        """
+        Returns a connection checked out with `acquire` to the pool.
+
+        Any transaction left open by the caller is rolled back before the connection is reused.
+
+        Parameters:
+            connection (sqlite3.Connection): The connection to release.
+        """
+        if getattr(self._local, "connection", None) is not connection:
+            return
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.connection = None
+        if self._closed:
+            self._discard(connection)
+            return
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error:
+            self._discard(connection)
+            return
+        self._idle.put(connection)
+
+    def closeAll(self):
+        """
+        Closes every idle connection and marks the pool as closed, so connections currently
+        checked out are closed when released instead of going back to the pool and new checkouts
+        fail until `open` is called.
+        """
+        self._closed = True
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+
+    def open(self):
+        """
+        Reopens a pool closed with `closeAll`, e.g. when the server starts again in the same process.
+        """
+        self._closed = False
+
+    def _checkout(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._createIfAllowed()
+                if connection is None:
+                    try:
+                        connection = self._idle.get(timeout=self.timeout)
+                    except queue.Empty:
+                        raise sqlite3.OperationalError("Connection pool exhausted")
+            if self._isHealthy(connection):
+                return connection
+            self._discard(connection)
+
+    def _createIfAllowed(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return self.createConnection()
+        except sqlite3.Error:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _isHealthy(self, connection):
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, connection):
+        with self._lock:
+            self._created -= 1
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+connectionPool = ConnectionPool()
+
+def acquireConnection():
+    """
+    Checks out a connection from the process-wide pool.
+
+    Returns:
+        sqlite3.Connection: A connection that must be given back with `releaseConnection`.
+
+    Example:
+        connection = acquireConnection()
+        try:
+            cursor = connection.cursor()
+        finally:
+            releaseConnection(connection)
+    """
+    return connectionPool.acquire()
+
+def releaseConnection(connection):
+    """
+    Returns a connection to the process-wide pool.
+
+    Parameters:
+        connection (sqlite3.Connection): The connection obtained from `acquireConnection`.
+
+    Example:
+        releaseConnection(connection)
+    """
+    connectionPool.release(connection)
@@ -1,5 +1,27 @@
 import sqlite3
 from databaseOutputParser import *
+from databaseWriter import *
+
+# Saves the summary of a user in a session, replacing an earlier one (e.g., written when the
+# user left and uploaded again by the client). An HRV left empty keeps the stored value.
+SESSION_SUMMARY_UPSERT = """
+    INSERT INTO sessionSummary (sessionId, username, hrCount, hrAverage, hrMaximum, hrMinimum, hrv)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (sessionId, username) DO UPDATE SET
+        hrCount = excluded.hrCount,
+        hrAverage = excluded.hrAverage,
+        hrMaximum = excluded.hrMaximum,
+        hrMinimum = excluded.hrMinimum,
+        hrv = COALESCE(excluded.hrv, sessionSummary.hrv)
+    """
+
+# Saves the summary of a user in a session unless one was already written (e.g., uploaded by
+# the client), for summaries written by the server in the background.
+SESSION_SUMMARY_INSERT = """
+    INSERT INTO sessionSummary (sessionId, username, hrCount, hrAverage, hrMaximum, hrMinimum, hrv)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (sessionId, username) DO NOTHING
+    """
 
 def addSessionToDatabase(name, teacher, description, date, hour, spots):
     """
@@ -9,7 +31,7 @@ def addSessionToDatabase(name, teacher, description, date, hour, spots):
         name (str): The name of the session.
         teacher (str): The teacher conducting the session.
         description (str): A description of the session.
-        date (str): The date of the session.
+        date (str): The date of the session in the format "dd-mm-yyyy".
         hour (str): The hour of the session.
         spots (int): The number of available spots in the session.
 
@@ -17,25 +39,17 @@ def addSessionToDatabase(name, teacher, description, date, hour, spots):
         bool: True if the session was successfully added, False otherwise.
 
     Example:
-        addSessionToDatabase("Pilates", "Example name", "Simple Pilates lesson", "2023-10-15", "10", 20)
+        addSessionToDatabase("Pilates", "Example name", "Simple Pilates lesson", "15-10-2023", "10", 20)
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         insert_query = """
-        INSERT INTO session (name, teacher, description, date, hour, spots)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO session (name, teacher, description, date, hour, spots, sessionDate)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         """
-        cursor.execute(insert_query, (name, teacher, description, date, hour, spots))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(insert_query, (name, teacher, description, date, hour, spots, toSortableDate(date))) != 0
     except Exception as e:
         print(f"Error in addSessionToDatabase: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def addUserToDatabase(username, firstName, lastName, email, dateOfBirth, password, gender):
@@ -57,23 +71,15 @@ def addUserToDatabase(username, firstName, lastName, email, dateOfBirth, passwor
     Example:
         addUserToDatabase("exampleUsername", "Example", "Name", "example.email@example.com", "1990-01-01", "password123", "M")
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         insert_query = """
         INSERT INTO user (username, firstName, lastName, email, dateOfBirth, password, gender)
         VALUES (?, ?, ?, ?, ?, ?, ?)
         """
-        cursor.execute(insert_query, (username, firstName, lastName, email, dateOfBirth, password, gender))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(insert_query, (username, firstName, lastName, email, dateOfBirth, password, gender)) != 0
     except Exception as e:
         print(f"Error in addUserToDatabase: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def addToSessionSigning(sessionId, username):
@@ -90,28 +96,21 @@ def addToSessionSigning(sessionId, username):
     Example:
         addToSessionSigning(1, "example123")
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         insert_query = """
         INSERT INTO sessionSigning (sessionId, username)
         VALUES (?, ?)
         """
-        cursor.execute(insert_query, (sessionId, username))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(insert_query, (sessionId, username)) != 0
     except Exception as e:
         print(f"Error in addToSessionSigning: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def addToSessionSummary(sessionId, username, count, average, maximum, minimum, hrv):
     """
     Adds a summary of a session to the `sessionSummary` table, including heart rate statistics.
+    An existing summary of the user in the session is replaced.
 
     Parameters:
         sessionId (int): The ID of the session.
@@ -128,23 +127,31 @@ def addToSessionSummary(sessionId, username, count, average, maximum, minimum, h
     Example:
         addToSessionSummary(1, "example123", 100, 75, 120, 60, 50)
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
-        insert_query = """
-        INSERT INTO sessionSummary (sessionId, username, hrCount, hrAverage, hrMaximum, hrMinimum, hrv)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        cursor.execute(insert_query, (sessionId, username, count, average, maximum, minimum, hrv))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(SESSION_SUMMARY_UPSERT, (sessionId, username, count, average, maximum, minimum, hrv)) != 0
     except Exception as e:
         print(f"Error in addToSessionSummary: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
+
+def addSessionSummaries(summaries, replace=True):
+    """
+    Adds the summaries of several users to the `sessionSummary` table in a single write.
+
+    Parameters:
+        summaries (list): Tuples of (sessionId, username, count, average, maximum, minimum, hrv).
+        replace (bool): Whether a summary replaces one already stored for the same user and session.
+
+    Returns:
+        bool: True if the summaries were successfully added, False otherwise.
+
+    Example:
+        addSessionSummaries([(1, "example123", 100, 75, 120, 60, 50), (1, "example456", 98, 80, 130, 62, None)])
+    """
+    try:
+        return executeWriteMany(SESSION_SUMMARY_UPSERT if replace else SESSION_SUMMARY_INSERT, summaries) != 0
+    except Exception as e:
+        print(f"Error in addSessionSummaries: {e}")
+        return False
 
 
 def removeFromSessionSigning(sessionId, username):
@@ -161,24 +168,16 @@ def removeFromSessionSigning(sessionId, username):
     Example:
         removeFromSessionSigning(1, "example123")
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         remove_query = """
         DELETE FROM sessionSigning
         WHERE sessionId = ?
         AND username = ?;
         """
-        cursor.execute(remove_query, (sessionId, username))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(remove_query, (sessionId, username)) != 0
     except Exception as e:
         print(f"Error in removeFromSessionSigning: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def changePassword(username, newPassword):
@@ -195,24 +194,16 @@ def changePassword(username, newPassword):
     Example:
         changePassword("example123", "newpassword123")
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         update_query = """
         UPDATE user
         SET password = ?
         WHERE username = ?
         """
-        cursor.execute(update_query, (newPassword, username))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(update_query, (newPassword, username)) != 0
     except Exception as e:
         print(f"Error in changePassword: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def cancelSession(sessionId):
@@ -228,23 +219,15 @@ def cancelSession(sessionId):
     Example:
         cancelSession(1)
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         delete_query = """
         DELETE from session
         WHERE sessionId = ?
         """
-        cursor.execute(delete_query, (sessionId,))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(delete_query, (sessionId,)) != 0
     except Exception as e:
         print(f"Error in cancelSession: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def setSessionToActive(sessionId):
@@ -260,24 +243,16 @@ def setSessionToActive(sessionId):
     Example:
         setSessionToActive(1)
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         update_query = """
         UPDATE session
         SET isActive = 1
         WHERE sessionId = ?
         """
-        cursor.execute(update_query, (sessionId,))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(update_query, (sessionId,)) != 0
     except Exception as e:
         print(f"Error in setSessionToActive: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
 
 
 def setSessionToInactive(sessionId):
@@ -293,21 +268,42 @@ def setSessionToInactive(sessionId):
     Example:
         setSessionToInactive(1)
     """
-    connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
-        cursor = connection.cursor()
         update_query = """
         UPDATE session
         SET isActive = -1
         WHERE sessionId = ?
         """
-        cursor.execute(update_query, (sessionId,))
-        connection.commit()
-        return cursor.rowcount != 0
+        return executeWrite(update_query, (sessionId,)) != 0
     except Exception as e:
         print(f"Error in setSessionToInactive: {e}")
         return False
-    finally:
-        if connection:
-            connection.close()
\ No newline at end of file
+
+
+def repairFilledSpots():
+    """
+    Recomputes the `filledSpots` counter of every session from the `sessionSigning` table.
+
+    The counter is kept up to date by triggers, so this is only needed after the tables were
+    edited with the triggers disabled or dropped.
+
+    Returns:
+        int: The number of sessions whose counter was wrong and has been fixed.
+
+    Example:
+        repaired = repairFilledSpots()
+    """
+    try:
+        update_query = """
+        UPDATE session
+        SET filledSpots = (
+            SELECT COUNT(*) FROM sessionSigning WHERE sessionSigning.sessionId = session.sessionId
+        )
+        WHERE filledSpots != (
+            SELECT COUNT(*) FROM sessionSigning WHERE sessionSigning.sessionId = session.sessionId
+        )
+        """
+        return executeWrite(update_query)
+    except Exception as e:
+        print(f"Error in repairFilledSpots: {e}")
+        return 0
@@ -1,6 +1,7 @@
 import sqlite3
 from dataModels import *
 from databaseOutputParser import *
+from databaseConnectionPool import *
 import logging
 import hashlib
 import os
@@ -10,10 +11,35 @@ logger = logging.getLogger('uvicorn.error')
 logger.setLevel(logging.DEBUG)
 ph = PasswordHasher()
 
+# Session columns followed by the number of signed users and the teacher's display name,
+# in the order expected by parseSessionRowOutput.
+SESSION_SELECT = """
+    SELECT session.sessionId, session.name, session.teacher, session.description,
+        session.date, session.hour, session.spots, session.isActive, session.filledSpots,
+        COALESCE(teacher.name, session.teacher)
+    FROM session
+    LEFT JOIN teacher ON teacher.username = session.teacher
+    """
+
+# Conditions selecting the sessions a teacher can start today or still has scheduled
+TEACHER_SESSION_FILTERS = {
+    "joinable": "session.sessionDate = ?",
+    "signed": "session.sessionDate > ?",
+}
+
+# Conditions selecting the joined sessions of each type, compared against today's date:
+# joinable sessions are active today with no summary yet, previous sessions already have
+# a summary and signed sessions are still in the future.
+JOINED_SESSION_FILTERS = {
+    "joinable": "session.sessionDate = ? AND session.isActive = 1 AND sessionSummary.sessionId IS NULL",
+    "previous": "session.sessionDate <= ? AND sessionSummary.sessionId IS NOT NULL",
+    "signed": "session.sessionDate > ?",
+}
+
 def attemptLogin(username, password):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT * 
@@ -32,7 +58,7 @@ def attemptLogin(username, password):
         return False
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def verifyPassword(stored_password: str, password: str):
     """
@@ -59,7 +85,7 @@ def verifyPassword(stored_password: str, password: str):
 def searchForUserWithEmail(email):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT * 
@@ -78,12 +104,12 @@ def searchForUserWithEmail(email):
         return False
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForUserWithUsername(username):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT * 
@@ -102,59 +128,49 @@ def searchForUserWithUsername(username):
         return False
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForSignableSessions(username):
-    signableSessions = []
-    try:
-        for signableId in searchForSignableSessionsIds(username):
-            session = searchForSession(signableId[0])
-            if session is not None and not isPastDate(session.date):
-                signableSessions.append(session)
-    except Exception as e:
-        logger.error(f"Error in searchForSignableSessions: {e}")
-    return signableSessions
-
-def searchForSignableSessionsIds(username):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
-        select_query = """
-            SELECT DISTINCT sessionId
-            FROM session
-            EXCEPT
-            SELECT sessionId
-            FROM sessionSigning
-            WHERE username = ?
+        select_query = SESSION_SELECT + """
+            WHERE session.isActive != -1
+            AND session.sessionDate >= ?
+            AND NOT EXISTS (
+                SELECT 1
+                FROM sessionSigning
+                WHERE sessionSigning.sessionId = session.sessionId
+                AND sessionSigning.username = ?
+            )
+            ORDER BY session.sessionId
             """
-        
-        cursor.execute(select_query, (username,))
-        session_ids = cursor.fetchall()
-        return session_ids
+
+        cursor.execute(select_query, (getTodayDate(), username,))
+        sessions = cursor.fetchall()
+        return [parseSessionRowOutput(session) for session in sessions]
     except sqlite3.Error as e:
-        logger.error(f"Database error in searchForSignableSessionsIds: {e}")
+        logger.error(f"Database error in searchForSignableSessions: {e}")
         return []
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForSession(sessionId):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
-        select_query = """
-            SELECT *
-            FROM session
-            WHERE sessionId = ?
-            AND isActive != -1
+        select_query = SESSION_SELECT + """
+            WHERE session.sessionId = ?
+            AND session.isActive != -1
             """
         
         cursor.execute(select_query, (sessionId,))
         session = cursor.fetchone()
         if session:
-            return parseSessionOutput(session, getNumberOfUsersInSession(sessionId), searchForTeacherName(session[2]))
+            return parseSessionRowOutput(session)
         else:
             return None
     except sqlite3.Error as e:
@@ -162,12 +178,12 @@ def searchForSession(sessionId):
         return None
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForTeacherName(username):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
             SELECT name
@@ -186,67 +202,62 @@ def searchForTeacherName(username):
         return username
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def getNumberOfUsersInSession(sessionId):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
-            SELECT username
-            FROM sessionSigning
+            SELECT filledSpots
+            FROM session
             WHERE sessionId = ?
             """
         
         cursor.execute(select_query, (sessionId,))
-        signings = cursor.fetchall()
-        return len(signings)
+        filledSpots = cursor.fetchone()
+        return filledSpots[0] if filledSpots else 0
     except sqlite3.Error as e:
         logger.error(f"Database error in getNumberOfUsersInSession: {e}")
         return 0
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForJoinedSessions(username, type):
-    joinableSessions = []
-    try:
-        for signableId in searchForJoinedSessionsIds(username):
-            session = searchForSession(signableId[0])
-            if session is not None:
-                date = session.date
-                if (isJoinable(type, date) and (searchForSessionSummary(username, session.id) is None) and session.isActive) or (isPrevious(type, date) and searchForSessionSummary(username, session.id)) or isSignOut(type, date):
-                    joinableSessions.append(session)
-    except Exception as e:
-        logger.error(f"Error in searchForJoinedSessions: {e}")
-    return joinableSessions
-
-def searchForJoinedSessionsIds(username):
+    if type not in JOINED_SESSION_FILTERS:
+        return []
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
-        select_query = """
-            SELECT DISTINCT sessionId
-            FROM sessionSigning
-            WHERE username = ?
+        select_query = SESSION_SELECT + f"""
+            JOIN sessionSigning
+            ON sessionSigning.sessionId = session.sessionId
+            LEFT JOIN sessionSummary
+            ON sessionSummary.sessionId = session.sessionId
+            AND sessionSummary.username = sessionSigning.username
+            WHERE sessionSigning.username = ?
+            AND session.isActive != -1
+            AND {JOINED_SESSION_FILTERS[type]}
+            ORDER BY session.sessionId
             """
-        
-        cursor.execute(select_query, (username,))
-        session_ids = cursor.fetchall()
-        return session_ids
+
+        cursor.execute(select_query, (username, getTodayDate(),))
+        sessions = cursor.fetchall()
+        return [parseSessionRowOutput(session) for session in sessions]
     except sqlite3.Error as e:
-        logger.error(f"Database error in searchForJoinedSessionsIds: {e}")
+        logger.error(f"Database error in searchForJoinedSessions: {e}")
         return []
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForSessionSummary(username, sessionId):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT * 
@@ -266,12 +277,12 @@ def searchForSessionSummary(username, sessionId):
         return None
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForUserDetails(username):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT * 
@@ -289,12 +300,12 @@ def searchForUserDetails(username):
         return None
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def isTeacher(name, password):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT * 
@@ -313,12 +324,12 @@ def isTeacher(name, password):
         return False
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def getUsersFromSession(sessionId):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT username 
@@ -334,47 +345,58 @@ def getUsersFromSession(sessionId):
         return []
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def searchForTeacherSessions(teacherName, type):
-    joinableSessions = []
+    if type not in TEACHER_SESSION_FILTERS:
+        return []
+    connection = None
     try:
-        for signableId in searchForJoinedTeacherSessionsIds(teacherName):
-            session = searchForSession(signableId[0])
-            if session is not None:
-                date = session.date
-                if (isJoinable(type, date)) or isSignOut(type, date):
-                    joinableSessions.append(session)
-    except Exception as e:
-        logger.error(f"Error in searchForTeacherSessions: {e}")
-    return joinableSessions
-
-def searchForJoinedTeacherSessionsIds(teacher):
+        connection = acquireConnection()
+        cursor = connection.cursor()
+        select_query = SESSION_SELECT + f"""
+            WHERE session.teacher = ?
+            AND session.isActive = 0
+            AND {TEACHER_SESSION_FILTERS[type]}
+            ORDER BY session.sessionId
+            """
+
+        cursor.execute(select_query, (teacherName, getTodayDate(),))
+        sessions = cursor.fetchall()
+        return [parseSessionRowOutput(session) for session in sessions]
+    except sqlite3.Error as e:
+        logger.error(f"Database error in searchForTeacherSessions: {e}")
+        return []
+    finally:
+        if connection:
+            releaseConnection(connection)
+
+def searchForActiveTeacherSessionIds(teacherName):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
-            SELECT DISTINCT sessionId
-            FROM session
-            WHERE teacher = ?
-            AND isActive = 0
-            """
-        
-        cursor.execute(select_query, (teacher,))
-        session_ids = cursor.fetchall()
-        return session_ids
+        SELECT sessionId
+        FROM session
+        WHERE teacher = ?
+        AND isActive = 1
+        ORDER BY sessionId
+        """
+
+        cursor.execute(select_query, (teacherName,))
+        return [str(row[0]) for row in cursor.fetchall()]
     except sqlite3.Error as e:
-        logger.error(f"Database error in searchForJoinedTeacherSessionsIds: {e}")
+        logger.error(f"Database error in searchForActiveTeacherSessionIds: {e}")
         return []
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def sessionExistsWithTeacher(teacherName, sessionId):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT *
@@ -391,20 +413,34 @@ def sessionExistsWithTeacher(teacherName, sessionId):
         return False
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def sessionIsToday(sessionId):
+    connection = None
     try:
-        session = searchForSession(sessionId)
-        return session is not None and isToday(session.date)
-    except Exception as e:
-        logger.error(f"Error in sessionIsToday: {e}")
+        connection = acquireConnection()
+        cursor = connection.cursor()
+        select_query = """
+        SELECT 1
+        FROM session
+        WHERE sessionId = ?
+        AND isActive != -1
+        AND sessionDate = ?
+        """
+
+        cursor.execute(select_query, (sessionId, getTodayDate(),))
+        return cursor.fetchone() is not None
+    except sqlite3.Error as e:
+        logger.error(f"Database error in sessionIsToday: {e}")
         return False
+    finally:
+        if connection:
+            releaseConnection(connection)
 
 def canEnterSession(sessionId):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT *
@@ -421,12 +457,12 @@ def canEnterSession(sessionId):
         return False
     finally:
         if connection:
-            connection.close()
+            releaseConnection(connection)
 
 def canLeaveSession(sessionId, username):
     connection = None
     try:
-        connection = sqlite3.connect("HeartRateMonitoring.sqlite3")
+        connection = acquireConnection()
         cursor = connection.cursor()
         select_query = """
         SELECT *
@@ -443,4 +479,4 @@ def canLeaveSession(sessionId, username):
         return False
     finally:
         if connection:
-            connection.close()
\ No newline at end of file
+            releaseConnection(connection)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import argparse
+from databaseBootstrap import *
+from databaseDataInsert import *
+
+def main():
+    """
+    Runs a maintenance command against the database.
+
+    Commands:
+        migrate: Applies every pending schema migration.
+        repair-filled-spots: Recomputes the signed users counter of every session.
+        settings: Prints the database settings in effect.
+
+    Example:
+        python databaseMaintenance.py repair-filled-spots
+    """
+    parser = argparse.ArgumentParser(description="Heart Rate Monitoring database maintenance.")
+    parser.add_argument("command", choices=["migrate", "repair-filled-spots", "settings"])
+    arguments = parser.parse_args()
+
+    settings = bootstrapDatabase()
+    if arguments.command == "migrate":
+        print(f"Database schema version: {settings['user_version']}")
+    elif arguments.command == "repair-filled-spots":
+        print(f"Sessions repaired: {repairFilledSpots()}")
+    elif arguments.command == "settings":
+        print(f"Database profile: {DATABASE_PROFILE}")
+        for name, value in settings.items():
+            print(f"{name}: {value}")
+    stopDatabaseWriter()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import sqlite3
+import logging
+from databaseConnectionPool import *
+
+logger = logging.getLogger('uvicorn.error')
+
+# Session date ("dd-mm-yyyy") of a row rewritten as "yyyy-mm-dd"
+SORTABLE_SESSION_DATE = "substr({table}.date, 7, 4) || '-' || substr({table}.date, 4, 2) || '-' || substr({table}.date, 1, 2)"
+
+# Schema changes applied in order to existing databases. The version of the last applied
+# migration is stored in the database's `user_version` header field.
+MIGRATIONS = [
+    (1, "Add indexes on the hot lookup columns", [
+        "CREATE INDEX IF NOT EXISTS sessionSigningUsernameIndex ON sessionSigning (username)",
+        "CREATE INDEX IF NOT EXISTS sessionTeacherActiveIndex ON session (teacher, isActive)",
+        "CREATE INDEX IF NOT EXISTS userEmailIndex ON user (email)",
+        "CREATE INDEX IF NOT EXISTS sessionSummaryUsernameIndex ON sessionSummary (username)",
+    ]),
+    (2, "Refresh query planner statistics", [
+        "ANALYZE",
+    ]),
+    (3, "Add a sortable session date", [
+        "ALTER TABLE session ADD COLUMN sessionDate TEXT",
+        f"UPDATE session SET sessionDate = {SORTABLE_SESSION_DATE.format(table='session')}",
+        "CREATE INDEX IF NOT EXISTS sessionDateIndex ON session (sessionDate)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS sessionDateInsertTrigger
+        AFTER INSERT ON session
+        WHEN NEW.sessionDate IS NULL
+        BEGIN
+            UPDATE session SET sessionDate = {SORTABLE_SESSION_DATE.format(table='NEW')} WHERE sessionId = NEW.sessionId;
+        END
+        """,
+        "ANALYZE",
+    ]),
+    (4, "Keep the number of signed users on each session", [
+        "ALTER TABLE session ADD COLUMN filledSpots INTEGER NOT NULL DEFAULT 0",
+        """
+        UPDATE session SET filledSpots = (
+            SELECT COUNT(*) FROM sessionSigning WHERE sessionSigning.sessionId = session.sessionId
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS sessionSigningInsertTrigger
+        AFTER INSERT ON sessionSigning
+        BEGIN
+            UPDATE session SET filledSpots = filledSpots + 1 WHERE sessionId = NEW.sessionId;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS sessionSigningDeleteTrigger
+        AFTER DELETE ON sessionSigning
+        BEGIN
+            UPDATE session SET filledSpots = filledSpots - 1 WHERE sessionId = OLD.sessionId;
+        END
+        """,
+    ]),
+    (5, "Store the raw heart rate and HRV samples", [
+        """
+        CREATE TABLE IF NOT EXISTS heartRateSample (
+            sessionId INTEGER NOT NULL,
+            username TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            hr INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS hrvSample (
+            sessionId INTEGER NOT NULL,
+            username TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            hrv REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS heartRateSampleIndex ON heartRateSample (sessionId, username, ts)",
+        "CREATE INDEX IF NOT EXISTS hrvSampleIndex ON hrvSample (sessionId, username, ts)",
+    ]),
+]
+
+def getSchemaVersion(connection):
+    """
+    Reads the schema version of a database.
+
+    Parameters:
+        connection (sqlite3.Connection): An open connection to the database.
+
+    Returns:
+        int: The version of the last migration applied (0 for a database never migrated).
+
+    Example:
+        version = getSchemaVersion(connection)
+    """
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+def applyMigrations(connection, migrations=MIGRATIONS):
+    """
+    Applies every pending migration to a database.
+
+    Each migration runs in its own transaction together with the update of the schema
+    version, so a failing migration leaves the database at the previous version.
+
+    Parameters:
+        connection (sqlite3.Connection): An open connection to the database.
+        migrations (list): Tuples of (version, description, statements) sorted by version.
+
+    Returns:
+        int: The schema version after applying the migrations.
+
+    Example:
+        version = applyMigrations(sqlite3.connect("HeartRateMonitoring.sqlite3"))
+    """
+    currentVersion = getSchemaVersion(connection)
+    for version, description, statements in migrations:
+        if version <= currentVersion:
+            continue
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            if getSchemaVersion(connection) >= version:
+                # Applied by another worker while this one was waiting for the lock
+                connection.execute("COMMIT")
+                currentVersion = version
+                continue
+            logger.info(f"Applying database migration {version}: {description}")
+            for statement in statements:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {version}")
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        currentVersion = version
+    return currentVersion
+
+def migrateDatabase():
+    """
+    Brings the pooled database up to the latest schema version.
+
+    Returns:
+        int: The schema version after applying the migrations.
+
+    Example:
+        version = migrateDatabase()
+    """
+    connection = acquireConnection()
+    isolationLevel = connection.isolation_level
+    try:
+        connection.isolation_level = None
+        return applyMigrations(connection)
+    finally:
+        connection.isolation_level = isolationLevel
+        releaseConnection(connection)
@@ -89,4 +89,20 @@ def parseSessionSummaryOutput(session, sessionSummary):
         maximum=sessionSummary[4],
         minimum=sessionSummary[5],
         hrv=sessionSummary[6]
-    )
\ No newline at end of file
+    )
+
+def parseSessionRowOutput(row):
+    """
+    Parses a joined session row into a `Session` object.
+
+    Parameters:
+        row (list or tuple): The eight `session` columns followed by the number of signed users
+            and the name of the teacher, as returned by queries built on `SESSION_SELECT`.
+
+    Returns:
+        Session: An object containing the parsed session data.
+
+    Example:
+        session_data = parseSessionRowOutput((1, "Pilates", "teacher1", "Simple Pilates", "15-10-2023", "10h", 20, 0, 15, "Example Teacher"))
+    """
+    return parseSessionOutput(row, row[8], row[9])
@@ -0,0 +1,164 @@
+import logging
+import threading
+from databaseWriter import *
+
+logger = logging.getLogger('uvicorn.error')
+
+# Seconds between two flushes of a sample buffer
+SAMPLE_FLUSH_INTERVAL = 1
+
+# Number of waiting samples that triggers a flush before the interval ends
+SAMPLE_FLUSH_SIZE = 500
+
+class SampleBuffer:
+    """
+    A write-behind buffer inserting rows in bulk through the database writer.
+
+    Rows are appended in memory, so a request storing a sample never waits for a commit. A
+    background thread inserts the waiting rows with a single `executemany` every `flushInterval`
+    seconds, or as soon as `flushSize` rows are waiting. Rows still in memory when the process
+    dies are lost, at most `flushInterval` seconds of samples.
+
+    Parameters:
+        query (str): The INSERT statement run for every row.
+        flushInterval (float): Seconds between two flushes.
+        flushSize (int): Number of waiting rows that triggers a flush.
+
+    Example:
+        buffer = SampleBuffer("INSERT INTO heartRateSample (sessionId, username, ts, hr) VALUES (?, ?, ?, ?)")
+        buffer.start()
+        buffer.add((1, "username123", 1698765432, 72))
+        buffer.stop()
+    """
+    def __init__(self, query, flushInterval=SAMPLE_FLUSH_INTERVAL, flushSize=SAMPLE_FLUSH_SIZE):
+        self.query = query
+        self.flushInterval = flushInterval
+        self.flushSize = flushSize
+        self.droppedRows = 0
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the thread flushing the buffer.
+        """
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="sample-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, row):
+        """
+        Appends a row to the buffer.
+
+        Parameters:
+            row (tuple): The parameters of the INSERT statement.
+        """
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.flushSize
+        if full:
+            self._wakeup.set()
+
+    def addMany(self, rows):
+        """
+        Appends several rows to the buffer.
+
+        Parameters:
+            rows (list): Parameter tuples of the INSERT statement.
+        """
+        with self._lock:
+            self._rows.extend(rows)
+            full = len(self._rows) >= self.flushSize
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Inserts every waiting row and waits for the commit.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            return executeWriteMany(self.query, rows)
+        except Exception as e:
+            self.droppedRows += len(rows)
+            logger.error(f"Error flushing {len(rows)} samples: {e}")
+            return 0
+
+    def stop(self):
+        """
+        Stops the flushing thread after inserting every waiting row.
+        """
+        if self._thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flushInterval)
+            self._wakeup.clear()
+            self.flush()
+
+heartRateSamples = SampleBuffer("INSERT INTO heartRateSample (sessionId, username, ts, hr) VALUES (?, ?, ?, ?)")
+hrvSamples = SampleBuffer("INSERT INTO hrvSample (sessionId, username, ts, hrv) VALUES (?, ?, ?, ?)")
+
+def addHeartRateSample(sessionId, username, ts, hr):
+    """
+    Queues a heart rate sample for insertion into `heartRateSample`.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+        username (str): The user's username.
+        ts (int): The timestamp of the sample (Unix time in seconds).
+        hr (int): The heart rate (BPM).
+
+    Example:
+        addHeartRateSample("1", "username123", 1698765432, 72)
+    """
+    heartRateSamples.add((sessionId, username, ts, hr))
+
+def addHRVSample(sessionId, username, ts, hrv):
+    """
+    Queues an HRV sample for insertion into `hrvSample`.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+        username (str): The user's username.
+        ts (int): The timestamp of the sample (Unix time in seconds).
+        hrv (float): The heart rate variability (ms).
+
+    Example:
+        addHRVSample("1", "username123", 1698765432, 50)
+    """
+    hrvSamples.add((sessionId, username, ts, hrv))
+
+def startSampleBuffers():
+    """
+    Starts flushing the heart rate and HRV sample buffers.
+
+    Example:
+        startSampleBuffers()
+    """
+    heartRateSamples.start()
+    hrvSamples.start()
+
+def stopSampleBuffers():
+    """
+    Inserts every waiting sample and stops the sample buffers. Must run before the database writer stops.
+
+    Example:
+        stopSampleBuffers()
+    """
+    heartRateSamples.stop()
+    hrvSamples.stop()
@@ -0,0 +1,234 @@
+import sqlite3
+import threading
+import queue
+import time
+from concurrent.futures import Future
+from databaseConnectionPool import *
+
+# Seconds the writer keeps collecting operations after the first one before committing
+WRITE_BATCH_WINDOW = 0.005
+
+# Maximum number of operations committed in a single transaction
+WRITE_BATCH_SIZE = 200
+
+class WriteOperation:
+    """
+    A single write waiting in the writer queue.
+
+    Parameters:
+        query (str): The SQL statement to run.
+        parameters (tuple or list): The statement parameters, or a list of them when `many` is True.
+        many (bool): Whether the statement runs once per item of `parameters` (executemany).
+    """
+    def __init__(self, query, parameters, many=False):
+        self.query = query
+        self.parameters = parameters
+        self.many = many
+        self.future = Future()
+
+class DatabaseWriter:
+    """
+    Serializes every database write through one thread and one connection.
+
+    Operations are taken from a queue and grouped into a single transaction: the writer commits
+    once per batch, collected for up to `batchWindow` seconds or `batchSize` operations. Each
+    operation runs inside its own savepoint, so a failing statement only fails its own caller
+    while the rest of the batch is still committed. Every caller receives a future resolved with
+    the rowcount of its statement once the batch is durable, or with the error it raised.
+
+    Parameters:
+        pool (ConnectionPool): The pool used to create the writer's connection.
+        batchWindow (float): Seconds to wait for more operations before committing.
+        batchSize (int): Maximum number of operations per transaction.
+
+    Example:
+        writer = DatabaseWriter(connectionPool)
+        writer.start()
+        rowcount = writer.submit("DELETE FROM session WHERE sessionId = ?", (1,)).result()
+        writer.stop()
+    """
+    def __init__(self, pool, batchWindow=WRITE_BATCH_WINDOW, batchSize=WRITE_BATCH_SIZE):
+        self.pool = pool
+        self.batchWindow = batchWindow
+        self.batchSize = batchSize
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the writer thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="database-writer", daemon=True)
+        self._thread.start()
+
+    def isRunning(self):
+        """
+        Checks if the writer thread is running.
+
+        Returns:
+            bool: True if the writer accepts operations, False otherwise.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, query, parameters=(), many=False):
+        """
+        Queues a write operation.
+
+        Parameters:
+            query (str): The SQL statement to run.
+            parameters (tuple or list): The statement parameters, or a list of them when `many` is True.
+            many (bool): Whether to run the statement once per item of `parameters`.
+
+        Returns:
+            Future: A future resolved with the number of rows changed by the statement.
+        """
+        operation = WriteOperation(query, parameters, many)
+        self._queue.put(operation)
+        return operation.future
+
+    def stop(self):
+        """
+        Commits every queued operation and stops the writer thread.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            connection = self.pool.createConnection()
+        except sqlite3.Error as e:
+            self._failQueued(e)
+            return
+        connection.isolation_level = None
+        try:
+            running = True
+            while running:
+                batch, running = self._collectBatch()
+                if batch:
+                    self._commitBatch(connection, batch)
+        finally:
+            connection.close()
+
+    def _failQueued(self, error):
+        while True:
+            try:
+                operation = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if operation is not None and operation.future.set_running_or_notify_cancel():
+                operation.future.set_exception(error)
+
+    def _collectBatch(self):
+        operation = self._queue.get()
+        if operation is None:
+            return [], False
+        batch = [operation]
+        deadline = time.monotonic() + self.batchWindow
+        while len(batch) < self.batchSize:
+            remaining = deadline - time.monotonic()
+            try:
+                operation = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if operation is None:
+                return batch, False
+            batch.append(operation)
+        return batch, True
+
+    def _commitBatch(self, connection, batch):
+        results = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for operation in batch:
+                if not operation.future.set_running_or_notify_cancel():
+                    continue
+                connection.execute("SAVEPOINT writeOperation")
+                try:
+                    if operation.many:
+                        cursor = connection.executemany(operation.query, operation.parameters)
+                    else:
+                        cursor = connection.execute(operation.query, operation.parameters)
+                    connection.execute("RELEASE writeOperation")
+                    results.append((operation, cursor.rowcount))
+                except Exception as e:
+                    connection.execute("ROLLBACK TO writeOperation")
+                    connection.execute("RELEASE writeOperation")
+                    operation.future.set_exception(e)
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for operation in batch:
+                if not operation.future.done():
+                    operation.future.set_exception(e)
+            return
+        for operation, rowcount in results:
+            operation.future.set_result(rowcount)
+
+databaseWriter = DatabaseWriter(connectionPool)
+writerLock = threading.Lock()
+
+def getDatabaseWriter():
+    """
+    Returns the process-wide database writer, starting it on first use.
+
+    Returns:
+        DatabaseWriter: The running writer.
+
+    Example:
+        writer = getDatabaseWriter()
+    """
+    with writerLock:
+        if not databaseWriter.isRunning():
+            databaseWriter.start()
+    return databaseWriter
+
+def executeWrite(query, parameters=()):
+    """
+    Runs a write statement through the database writer and waits for it to be committed.
+
+    Parameters:
+        query (str): The SQL statement to run.
+        parameters (tuple): The statement parameters.
+
+    Returns:
+        int: The number of rows changed by the statement.
+
+    Raises:
+        sqlite3.Error: If the statement or the commit failed.
+
+    Example:
+        rowcount = executeWrite("DELETE FROM session WHERE sessionId = ?", (1,))
+    """
+    return getDatabaseWriter().submit(query, parameters).result()
+
+def executeWriteMany(query, parameters):
+    """
+    Runs a write statement once per parameter tuple through the database writer and waits for it to be committed.
+
+    Parameters:
+        query (str): The SQL statement to run.
+        parameters (list): A list of parameter tuples.
+
+    Returns:
+        int: The number of rows changed by all the executions.
+
+    Raises:
+        sqlite3.Error: If the statement or the commit failed.
+
+    Example:
+        rowcount = executeWriteMany("INSERT INTO sessionSigning (sessionId, username) VALUES (?, ?)", [(1, "a"), (1, "b")])
+    """
+    return getDatabaseWriter().submit(query, parameters, many=True).result()
+
+def stopDatabaseWriter():
+    """
+    Commits every queued write and stops the database writer.
+
+    Example:
+        stopDatabaseWriter()
+    """
+    with writerLock:
+        databaseWriter.stop()
@@ -0,0 +1,206 @@
+import asyncio
+import glob
+import hashlib
+import logging
+import os
+import socket
+import stat
+import tempfile
+import time
+from dataModels import *
+from databaseConnectionPool import DATABASE_PATH
+
+logger = logging.getLogger('uvicorn.error')
+
+# Transport used to share session events between the workers of the server:
+# - "local": events stay in the worker that received them (single worker deployments).
+# - "unix": events are sent to every other worker over Unix domain datagram sockets.
+EVENT_TRANSPORT = "unix" if hasattr(socket, "AF_UNIX") else "local"
+
+# Directory holding one socket per worker. Derived from the database location so that separate
+# deployments on the same machine never exchange events.
+EVENT_SOCKET_DIRECTORY = os.path.join(
+    tempfile.gettempdir(),
+    "heartRateMonitoring-" + hashlib.sha1(os.path.abspath(DATABASE_PATH).encode()).hexdigest()[:12]
+)
+
+# Maximum size of a message between workers. Groups of events are split to stay below it.
+MAX_DATAGRAM_SIZE = 60000
+
+# Seconds between two scans of the socket directory for workers that started or stopped
+PEER_REFRESH_INTERVAL = 1
+
+class LocalEventTransport:
+    """
+    Transport for single worker deployments: events never leave the worker.
+
+    Example:
+        transport = LocalEventTransport()
+        transport.start(broker.deliver)
+    """
+    def start(self, onEvent):
+        """
+        Starts receiving events from other workers.
+
+        Parameters:
+            onEvent (callable): Called with every event received from another worker, as an
+                SSEData and the JSON payload it was decoded from.
+        """
+        pass
+
+    def send(self, payload):
+        """
+        Sends an event to the other workers.
+
+        Parameters:
+            payload (bytes): The JSON encoded event published in this worker.
+        """
+        pass
+
+    def sendMany(self, payloads):
+        """
+        Sends a group of events to the other workers.
+
+        Parameters:
+            payloads (list): The JSON encoded events published in this worker.
+        """
+        pass
+
+    def stop(self):
+        """
+        Stops the transport.
+        """
+        pass
+
+class UnixSocketEventTransport(LocalEventTransport):
+    """
+    Transport sharing events between the workers of one machine over Unix domain datagram sockets.
+
+    Every worker binds a socket named after its process ID in `directory` and sends each event it
+    publishes to the sockets of all the other workers. A group of events published together is
+    sent as newline-separated JSON in as few datagrams as possible. No external service is needed: sockets of
+    workers that stopped are removed when a send to them is refused. Events are dropped, never
+    queued, when a worker cannot keep up.
+
+    The directory is created private to the user running the server. The transport refuses to
+    start if it already exists and belongs to another user or is open to others, since anyone
+    able to add a socket to it would receive every worker's events.
+
+    Parameters:
+        directory (str): The directory shared by the workers' sockets.
+
+    Example:
+        transport = UnixSocketEventTransport("/tmp/heartRateMonitoring")
+        transport.start(broker.deliver)
+        transport.send(b'{"sessionId":"1","username":"example123","timeStamp":"10000","event":"HEARTRATE","value":"72"}')
+    """
+    def __init__(self, directory=EVENT_SOCKET_DIRECTORY):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self.socket = None
+        self.peers = []
+        self.peersRefreshedAt = 0
+        self.droppedEvents = 0
+        self._loop = None
+        self._onEvent = None
+
+    def start(self, onEvent):
+        self._prepareDirectory()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.path)
+        self.socket.setblocking(False)
+        self._onEvent = onEvent
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.socket.fileno(), self._receive)
+
+    def send(self, payload):
+        self._sendDatagram(payload)
+
+    def sendMany(self, payloads):
+        datagram = []
+        size = 0
+        for payload in payloads:
+            if datagram and size + len(payload) + 1 > MAX_DATAGRAM_SIZE:
+                self._sendDatagram(b"\n".join(datagram))
+                datagram = []
+                size = 0
+            datagram.append(payload)
+            size += len(payload) + 1
+        if datagram:
+            self._sendDatagram(b"\n".join(datagram))
+
+    def stop(self):
+        if self.socket is None:
+            return
+        self._loop.remove_reader(self.socket.fileno())
+        self.socket.close()
+        self.socket = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _receive(self):
+        while True:
+            try:
+                payload = self.socket.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            for line in payload.split(b"\n"):
+                try:
+                    self._onEvent(SSEData.model_validate_json(line), line)
+                except Exception as e:
+                    logger.error(f"Invalid event received from another worker: {e}")
+
+    def _sendDatagram(self, payload):
+        if self.socket is None:
+            return
+        for peer in self._getPeers():
+            try:
+                self.socket.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._removePeer(peer)
+            except (BlockingIOError, OSError) as e:
+                self.droppedEvents += 1
+                logger.debug(f"Event not sent to worker socket {peer}: {e}")
+
+    def _prepareDirectory(self):
+        try:
+            os.mkdir(self.directory, 0o700)
+        except FileExistsError:
+            pass
+        info = os.lstat(self.directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise PermissionError(f"Event socket directory {self.directory} must be a directory owned by the server's user with no group or other permissions")
+
+    def _getPeers(self):
+        now = time.monotonic()
+        if now - self.peersRefreshedAt > PEER_REFRESH_INTERVAL:
+            self.peers = [path for path in glob.glob(os.path.join(self.directory, "*.sock")) if path != self.path]
+            self.peersRefreshedAt = now
+        return self.peers
+
+    def _removePeer(self, peer):
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+        if peer in self.peers:
+            self.peers.remove(peer)
+
+def createEventTransport(transport=EVENT_TRANSPORT):
+    """
+    Creates the event transport configured for the server.
+
+    Parameters:
+        transport (str): "local" or "unix".
+
+    Returns:
+        LocalEventTransport: The transport instance.
+
+    Example:
+        transport = createEventTransport()
+    """
+    if transport == "unix":
+        return UnixSocketEventTransport()
+    return LocalEventTransport()
@@ -1,11 +1,33 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import router
+from contextlib import asynccontextmanager
+from routes import router, broker
+from eventTransport import *
+from databaseBootstrap import *
+from databaseAsync import *
+from databaseWriter import *
+from databaseSampleBuffer import *
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connectionPool.open()
+    bootstrapDatabase()
+    startSampleBuffers()
+    broker.startTransport(createEventTransport())
+    broker.startTicker()
+    yield
+    await broker.stopTicker()
+    broker.stopTransport()
+    shutdownDatabaseExecutor()
+    stopSampleBuffers()
+    stopDatabaseWriter()
+    connectionPool.closeAll()
 
 app = FastAPI(
     title="Heart Rate Monitoring API",
     description="API created for HR and HRV monitoring.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -0,0 +1,109 @@
+import struct
+import sys
+from array import array
+from dataModels import MIN_HEART_RATE, MAX_HEART_RATE, MAX_UNIX_TIME
+
+# Magic bytes and version at the start of every binary heartbeat packet
+PACKET_MAGIC = b"HR"
+PACKET_VERSION = 1
+
+# Flag set when the heart rates are unsigned 16-bit integers instead of unsigned bytes
+FLAG_UINT16_HEART_RATE = 0x01
+
+# Maximum number of samples in a packet, as for /heartbeat-batch
+MAX_PACKET_SAMPLES = 1000
+
+# Little-endian header: magic, version, flags, base timestamp (Unix time in seconds),
+# number of samples, session ID length and username length
+PACKET_HEADER = struct.Struct("<2sBBIHBB")
+
+def parseHeartbeatPacket(packet):
+    """
+    Decodes a binary heartbeat packet.
+
+    Layout (little-endian):
+    - Header (12 bytes): magic "HR", version (uint8), flags (uint8), base timestamp (uint32),
+      number of samples (uint16), session ID length (uint8) and username length (uint8).
+    - The session ID and the username, UTF-8 encoded, followed by zero padding up to a
+      multiple of 4 bytes.
+    - The offsets of the samples from the base timestamp, in seconds (one uint32 each).
+    - The heart rates (one uint8 each, or uint16 when bit 0 of the flags is set).
+
+    The offsets and heart rates are read through views of the request body cast to the integer
+    types, without copying the arrays.
+
+    Parameters:
+        packet (bytes): The packet.
+
+    Returns:
+        tuple: The session ID, the username and a list of (timeStamp, heartRate) samples.
+
+    Raises:
+        ValueError: If the packet is malformed, or a heart rate or sample time is outside the
+            range accepted by the JSON endpoints (`MIN_HEART_RATE`..`MAX_HEART_RATE` BPM and up to `MAX_UNIX_TIME`).
+
+    Example:
+        sessionId, username, samples = parseHeartbeatPacket(encodeHeartbeatPacket("1", "example123", 1698765432, [0, 1], [72, 74]))
+    """
+    view = memoryview(packet)
+    if len(view) < PACKET_HEADER.size:
+        raise ValueError("Packet shorter than its header")
+    magic, version, flags, baseTimeStamp, count, sessionIdLength, usernameLength = PACKET_HEADER.unpack_from(view)
+    if magic != PACKET_MAGIC or version != PACKET_VERSION:
+        raise ValueError("Unknown packet format")
+    if flags & ~FLAG_UINT16_HEART_RATE:
+        raise ValueError("Unknown packet flags")
+    if not 1 <= count <= MAX_PACKET_SAMPLES or not sessionIdLength or not usernameLength:
+        raise ValueError("Invalid packet header")
+    heartRateFormat = "H" if flags & FLAG_UINT16_HEART_RATE else "B"
+    offset = PACKET_HEADER.size
+    sessionId = str(view[offset:offset + sessionIdLength], "utf-8")
+    offset += sessionIdLength
+    username = str(view[offset:offset + usernameLength], "utf-8")
+    offset = (offset + usernameLength + 3) & ~3
+    ratesOffset = offset + 4 * count
+    if len(view) != ratesOffset + struct.calcsize(heartRateFormat) * count:
+        raise ValueError("Packet length does not match its header")
+    offsets = view[offset:ratesOffset].cast("I")
+    heartRates = view[ratesOffset:].cast(heartRateFormat)
+    if sys.byteorder == "big":
+        offsets = _swapBytes("I", offsets)
+        if heartRateFormat == "H":
+            heartRates = _swapBytes("H", heartRates)
+    if min(heartRates) < MIN_HEART_RATE or max(heartRates) > MAX_HEART_RATE:
+        raise ValueError("Heart rate out of range")
+    if baseTimeStamp + max(offsets) > MAX_UNIX_TIME:
+        raise ValueError("Sample time out of range")
+    return sessionId, username, [(baseTimeStamp + delta, heartRate) for delta, heartRate in zip(offsets, heartRates)]
+
+def encodeHeartbeatPacket(sessionId, username, baseTimeStamp, offsets, heartRates):
+    """
+    Encodes samples as a binary heartbeat packet, the format read by `parseHeartbeatPacket`.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+        username (str): The user's username.
+        baseTimeStamp (int): The timestamp of the first sample (Unix time in seconds).
+        offsets (list): The offset of each sample from `baseTimeStamp`, in seconds.
+        heartRates (list): The heart rate of each sample (BPM).
+
+    Returns:
+        bytes: The packet. Heart rates are stored as bytes unless one of them exceeds 255.
+
+    Example:
+        packet = encodeHeartbeatPacket("1", "example123", 1698765432, [0, 1, 2], [72, 74, 73])
+    """
+    sessionIdBytes = sessionId.encode()
+    usernameBytes = username.encode()
+    flags = FLAG_UINT16_HEART_RATE if max(heartRates) > 0xFF else 0
+    header = PACKET_HEADER.pack(PACKET_MAGIC, PACKET_VERSION, flags, baseTimeStamp, len(heartRates), len(sessionIdBytes), len(usernameBytes))
+    strings = sessionIdBytes + usernameBytes
+    padding = b"\x00" * (-(len(header) + len(strings)) % 4)
+    heartRateFormat = "H" if flags else "B"
+    body = struct.pack(f"<{len(offsets)}I", *offsets) + struct.pack(f"<{len(heartRates)}{heartRateFormat}", *heartRates)
+    return header + strings + padding + body
+
+def _swapBytes(typecode, values):
+    swapped = array(typecode, values)
+    swapped.byteswap()
+    return swapped
@@ -0,0 +1,56 @@
+# NumPy is imported by computeHRVMetrics when it is first called, so the API starts without it
+# and only `/rr-intervals` needs it.
+
+# Number of successive RR differences in each window of the rolling RMSSD
+ROLLING_WINDOW = 30
+
+# Successive RR differences above this many milliseconds count towards pNN50
+NN50_THRESHOLD = 50
+
+def computeHRVMetrics(intervals, window=ROLLING_WINDOW):
+    """
+    Computes the time-domain HRV metrics of a series of RR intervals.
+
+    Every metric is computed with NumPy over the whole series at once:
+    - RMSSD: root mean square of the successive differences.
+    - SDNN: sample standard deviation of the intervals.
+    - pNN50: percentage of successive differences larger than 50 ms.
+    - Mean RR: average interval.
+    - Rolling RMSSD: RMSSD of every `window` consecutive differences, for live display.
+
+    Parameters:
+        intervals (list): RR intervals in milliseconds, oldest first (at least 2).
+        window (int): Number of successive differences per rolling RMSSD value.
+
+    Returns:
+        dict: `rmssd`, `sdnn`, `pnn50`, `meanRR` and `rollingRmssd` (empty when the series is
+            shorter than the window).
+
+    Raises:
+        ValueError: If there are fewer than 2 intervals or an interval is not positive.
+        ImportError: If NumPy is not installed.
+
+    Example:
+        metrics = computeHRVMetrics([812, 845, 790, 830, 801])
+        print(round(metrics["rmssd"], 1))  # Output: 40.5
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    rr = np.asarray(intervals, dtype=np.float64)
+    if rr.ndim != 1 or rr.size < 2:
+        raise ValueError("At least 2 RR intervals are required")
+    if not np.all(rr > 0):
+        raise ValueError("RR intervals must be positive")
+    differences = np.diff(rr)
+    squaredDifferences = differences * differences
+    rollingRmssd = []
+    if window > 0 and differences.size >= window:
+        rollingRmssd = np.sqrt(sliding_window_view(squaredDifferences, window).mean(axis=1)).tolist()
+    return {
+        "rmssd": float(np.sqrt(squaredDifferences.mean())),
+        "sdnn": float(rr.std(ddof=1)),
+        "pnn50": float(np.count_nonzero(np.abs(differences) > NN50_THRESHOLD) * 100 / differences.size),
+        "meanRR": float(rr.mean()),
+        "rollingRmssd": rollingRmssd,
+    }
@@ -0,0 +1,110 @@
+import struct
+from dataModels import *
+
+# Binary dashboard frame: event type, participant handle and value, little-endian
+DASHBOARD_FRAME = struct.Struct("<BHH")
+
+# Event types of the binary dashboard frames
+DASHBOARD_FRAME_TYPES = {"HEARTRATE": 1, "HRV": 2}
+
+def encodeDashboardFrame(event, handle, value):
+    """
+    Encodes a HEARTRATE or HRV value as a binary dashboard frame.
+
+    Parameters:
+        event (str): "HEARTRATE" or "HRV".
+        handle (int): The participant's handle in the session.
+        value (float): The value, rounded and clamped to an unsigned 16-bit integer.
+
+    Returns:
+        bytes: The 5-byte frame.
+
+    Example:
+        frame = encodeDashboardFrame("HEARTRATE", 3, 72)
+        frame.hex()  # Output: '0103004800'
+    """
+    return DASHBOARD_FRAME.pack(DASHBOARD_FRAME_TYPES[event], handle, min(max(round(value), 0), 0xFFFF))
+
+class LiveSessionStore:
+    """
+    In-memory state of the sessions being monitored, kept up to date from the session events.
+
+    For every session it tracks the users present and the last heart rate, HRV and timestamp
+    received from each of them, so a dashboard opened mid-session can render the current state
+    without reading the database or replaying past events. ENTER_SESSION adds a user,
+    LEAVE_SESSION removes them and HEARTRATE and HRV update them (adding users whose entry
+    happened before the server started).
+
+    Each participant gets a small integer handle, unique within the session until it is cleared,
+    that dashboards use to refer to them in binary frames. The handle is stored on every event of
+    the participant, together with the binary frame of HEARTRATE and HRV events, so the frame is
+    encoded once for every dashboard.
+
+    Example:
+        liveSessions = LiveSessionStore()
+        broker.addObserver(liveSessions.observe)
+        snapshot = liveSessions.getSnapshot("1")
+    """
+    def __init__(self):
+        self.sessions = {}
+        self.nextHandles = {}
+
+    def observe(self, brokerEvent):
+        """
+        Applies a session event to the state of its session.
+
+        Parameters:
+            brokerEvent (BrokerEvent): The event delivered by the broker.
+        """
+        data = brokerEvent.data
+        if data.event == "LEAVE_SESSION":
+            participant = self.sessions.get(data.sessionId, {}).pop(data.username, None)
+            if participant is not None:
+                brokerEvent.handle = participant.handle
+            return
+        if data.event not in ("ENTER_SESSION", "HEARTRATE", "HRV"):
+            return
+        value = int(float(data.value)) if data.event == "HEARTRATE" else float(data.value) if data.event == "HRV" else data.value
+        participant = self._getParticipant(data.sessionId, data.username)
+        if data.event == "ENTER_SESSION":
+            participant.name = value or participant.name
+        elif data.event == "HEARTRATE":
+            participant.heartRate = value
+        else:
+            participant.hrv = value
+        participant.timeStamp = data.timeStamp
+        brokerEvent.handle = participant.handle
+        if data.event in DASHBOARD_FRAME_TYPES:
+            brokerEvent.binaryFrame = encodeDashboardFrame(data.event, participant.handle, value)
+
+    def getSnapshot(self, sessionId):
+        """
+        Returns the current state of a session.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+
+        Returns:
+            LiveSessionSnapshot: The users present in the session and their last values.
+        """
+        participants = self.sessions.get(sessionId, {})
+        return LiveSessionSnapshot(sessionId=sessionId, participants=list(participants.values()))
+
+    def clearSession(self, sessionId):
+        """
+        Forgets the state of a session that has ended.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+        """
+        self.sessions.pop(sessionId, None)
+        self.nextHandles.pop(sessionId, None)
+
+    def _getParticipant(self, sessionId, username):
+        participants = self.sessions.setdefault(sessionId, {})
+        participant = participants.get(username)
+        if participant is None:
+            handle = self.nextHandles.get(sessionId, 1)
+            self.nextHandles[sessionId] = handle % 0xFFFF + 1
+            participant = participants[username] = LiveParticipant(username=username, handle=handle)
+        return participant
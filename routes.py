@@ -1,10 +1,40 @@
 from utils import *
-from fastapi import APIRouter, Header
+from fastapi import APIRouter, Header, Request, WebSocket, WebSocketDisconnect
 from typing import Optional
 import time
 from datetime import datetime, timedelta
+from sessionBroker import *
+from liveSessionState import *
+from sessionAggregates import *
+from heartbeatPacket import *
+from hrvAnalysis import *
+
+broker = SessionBroker()
+liveSessions = LiveSessionStore()
+broker.addObserver(liveSessions.observe)
+broker.addSessionCleaner(liveSessions.clearSession)
+sessionAggregates = SessionAggregateStore()
+broker.addObserver(sessionAggregates.observe)
+
+def saveIdleSessionAggregates(sessionId):
+    """
+    Writes the summaries of a session the broker forgot after it stayed idle, so a session that is
+    never closed keeps its summaries.
+
+    Every worker forgets the session on its own, so the summaries are only inserted where none was
+    stored yet. The write runs on the database executor without blocking the event loop.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+
+    Example:
+        broker.addSessionCleaner(saveIdleSessionAggregates)
+    """
+    aggregates = sessionAggregates.popSession(sessionId)
+    if aggregates:
+        getDatabaseExecutor().submit(saveSessionAggregates, sessionId, aggregates, False)
 
-event_queue = asyncio.Queue()
+broker.addSessionCleaner(saveIdleSessionAggregates)
 
 sessionTokens = {}
 tokenExpireTime = {}
@@ -15,6 +45,10 @@ router = APIRouter(prefix="")
 # Token Expiration (login tokens are valid for 15 minutes after last use)
 TOKEN_EXPIRATION = 15 * 60
 
+# Seconds a device WebSocket has to authenticate, and between two checks of its token
+DEVICE_AUTHENTICATION_TIMEOUT = 10
+DEVICE_TOKEN_RECHECK_INTERVAL = 60
+
 def isTokenExpired(username: str):
     """
     Checks if the token for the given username has expired.
@@ -262,7 +296,7 @@ def getUser(username, device_token: str = Header(...)):
 async def get_user_sessions(username: str, type: str, device_token: str = Header(...)):
 		if not isTokenValid(username, device_token):
 				return PostResponse(statusCode=400, message="INVALID_TOKEN")
-		return getUserSessions(username, type)
+		return await runDatabaseCall(getUserSessions, username, type)
 
 @router.get(
 		"/get-sessions/{username}",
@@ -353,13 +387,16 @@ def registerUser(user: RegisterUser):
 		"/heartbeat-info",
 		summary="Send Heartbeat Info",
 		description="""
-		Sends heartbeat information for a session.
+		Sends heartbeat information for a session. The sample is stored in `heartRateSample` and sent to the session's streams.
 		
 		Request Body:
 		- `sessionId` (string): The ID of the session.
 		- `username` (string): The user's username.
-		- `heartRate` (int): The user's heart rate (BPM).
-		- `timeStamp` (int): The timestamp of the heartbeat data.
+		- `heartRate` (int): The user's heart rate (BPM), between 1 and 300.
+		- `timeStamp` (int): The timestamp of the heartbeat data (Unix time in seconds). The event sent to the streams carries the same timestamp.
+
+		Responses:
+		- If the body is invalid, returns a `422 Unprocessable Entity` status.
 
 		Example Request:
 		{
@@ -371,13 +408,92 @@ def registerUser(user: RegisterUser):
 		"""
 )
 async def sendHeartbeatInfo(info: HeartbeatInfo):
-		await event_queue.put(await getSSEPostResponse(info.sessionId, info.username, getCurrentTimeStamp(), "HEARTRATE", str(info.heartRate)))
+		ingestHeartbeatSamples(info.sessionId, info.username, [(info.timeStamp, info.heartRate)])
+
+@router.post(
+		"/heartbeat-batch",
+		summary="Send Heartbeat Batch",
+		description="""
+		Sends several heart rate samples of a user in one request, e.g. every few seconds instead of every second.
+		The samples are stored in `heartRateSample` and sent to the session's streams together, each with its own timestamp.
+
+		Request Body:
+		- `sessionId` (string): The ID of the session.
+		- `username` (string): The user's username.
+		- `samples` (list): Between 1 and 1000 samples, oldest first:
+			- `timeStamp` (int): The timestamp of the sample (Unix time in seconds).
+			- `heartRate` (int): The user's heart rate (BPM), between 1 and 300.
+
+		Responses:
+		- Returns a `200 OK` status with the message `HEARTBEAT_BATCH_OK`.
+		- If the body is invalid, e.g. a heart rate or timestamp out of range, returns a `422 Unprocessable Entity` status.
+
+		Example Request:
+		{
+			"sessionId": "1",
+			"username": "username123",
+			"samples": [
+				{"timeStamp": 1698765432, "heartRate": 72},
+				{"timeStamp": 1698765433, "heartRate": 74}
+			]
+		}
+
+		Example Response:
+		{
+			"statusCode": 200,
+			"message": "HEARTBEAT_BATCH_OK"
+		}
+		"""
+)
+async def sendHeartbeatBatch(batch: HeartbeatBatch):
+		ingestHeartbeatSamples(batch.sessionId, batch.username, [(sample.timeStamp, sample.heartRate) for sample in batch.samples])
+		return PostResponse(statusCode=200, message="HEARTBEAT_BATCH_OK")
+
+@router.post(
+		"/heartbeat-binary",
+		summary="Send Binary Heartbeat Batch",
+		description="""
+		Sends several heart rate samples of a user in a compact binary packet (`Content-Type: application/octet-stream`), for devices where bandwidth and battery matter. The samples are handled as in `/heartbeat-batch`, which keeps accepting JSON.
+
+		Request Body (little-endian):
+		- Header (12 bytes):
+			- Magic `HR` (2 bytes) and version `1` (uint8).
+			- Flags (uint8): bit 0 set when heart rates are uint16 instead of uint8.
+			- Base timestamp (uint32): Unix time in seconds of the first sample.
+			- Number of samples (uint16): between 1 and 1000.
+			- Session ID length and username length (uint8 each).
+		- The session ID and username (UTF-8), zero-padded to a multiple of 4 bytes.
+		- The offset of each sample from the base timestamp in seconds (uint32 each).
+		- The heart rate of each sample (uint8 or uint16 each).
+
+		Responses:
+		- Returns a `200 OK` status with the message `HEARTBEAT_BATCH_OK`.
+		- If the packet is malformed, or a heart rate or sample time is outside the bounds of `/heartbeat-batch`:
+			- Returns a `400 Bad Request` status with the message `INVALID_PACKET`.
+
+		Example Request (session "1", user "ab", samples 72 and 74 BPM one second apart):
+		48 52 01 00 78 1a 41 65 02 00 01 02 31 61 62 00 00 00 00 00 01 00 00 00 48 4a
+
+		Example Response:
+		{
+			"statusCode": 200,
+			"message": "HEARTBEAT_BATCH_OK"
+		}
+		"""
+)
+async def sendHeartbeatBinary(request: Request):
+		try:
+				sessionId, username, samples = parseHeartbeatPacket(await request.body())
+		except ValueError:
+				return PostResponse(statusCode=400, message="INVALID_PACKET")
+		ingestHeartbeatSamples(sessionId, username, samples)
+		return PostResponse(statusCode=200, message="HEARTBEAT_BATCH_OK")
 
 @router.post(
 		"/hrv",
 		summary="Send HRV Info",
 		description="""
-		Sends Heart Rate Variability (HRV) information for a session.
+		Sends Heart Rate Variability (HRV) information for a session. The sample is stored in `hrvSample`, timestamped on arrival, and sent to the session's streams.
 		
 		Request Body:
 		- `sessionId` (string): The ID of the session.
@@ -393,7 +509,54 @@ async def sendHeartbeatInfo(info: HeartbeatInfo):
 		"""
 )
 async def sendHeartbeatInfo(info: HRVInfo):
-		await event_queue.put(await getSSEPostResponse(info.sessionId, info.username, getCurrentTimeStamp(), "HRV", str(info.hrv)))
+		ingestHRVSample(info.sessionId, info.username, info.hrv)
+
+@router.post(
+		"/rr-intervals",
+		summary="Send RR Intervals",
+		description="""
+		Computes the time-domain HRV of a series of RR intervals on the server, so every device's HRV is computed the same way.
+		The RMSSD is stored in `hrvSample` and sent to the session's streams as an HRV event, like a value sent to `/hrv`, and becomes the HRV of the user's session summary.
+
+		Request Body:
+		- `sessionId` (string): The ID of the session.
+		- `username` (string): The user's username.
+		- `intervals` (list): Between 2 and 10000 RR intervals in milliseconds, oldest first.
+		- `window` (int, optional): Number of successive differences per rolling RMSSD value (default 30).
+
+		Responses:
+		- Returns the RMSSD, SDNN, pNN50 and mean RR of the series, and the rolling RMSSD for live display.
+		- If an interval is not positive:
+			- Returns a `400 Bad Request` status with the message `INVALID_INTERVALS`.
+		- If NumPy is not installed on the server:
+			- Returns a `501 Not Implemented` status with the message `HRV_ANALYSIS_UNAVAILABLE`.
+
+		Example Request:
+		{
+			"sessionId": "1",
+			"username": "username123",
+			"intervals": [812, 845, 790, 830, 801]
+		}
+
+		Example Response:
+		{
+			"rmssd": 40.48,
+			"sdnn": 22.1,
+			"pnn50": 25.0,
+			"meanRR": 815.6,
+			"rollingRmssd": []
+		}
+		"""
+)
+async def sendRRIntervals(rrIntervals: RRIntervals):
+		try:
+				metrics = computeHRVMetrics(rrIntervals.intervals, rrIntervals.window)
+		except ValueError:
+				return PostResponse(statusCode=400, message="INVALID_INTERVALS")
+		except ImportError:
+				return PostResponse(statusCode=501, message="HRV_ANALYSIS_UNAVAILABLE")
+		ingestHRVSample(rrIntervals.sessionId, rrIntervals.username, round(metrics["rmssd"], 1))
+		return HRVMetrics(**metrics)
 
 @router.post(
 		"/session-sign-in/",
@@ -475,15 +638,25 @@ def signOutSession(sessionSignData: SessionSignData, device_token: str = Header(
 		description="""
 		Sends a summary of the session to the server.
 		
+		Summaries are also written by the server from the samples it received when the user leaves or the session closes, so this request is only needed to correct them.
+
 		Request Body:
 		- `sessionId` (string): The ID of the session.
 		- `username` (string): The user's username.
-		- `measurements` (list): A list of measurements taken during the session.
-		- `hrv` (int): The user's HRV value (ms).
+		- `measurements` (list, optional): A list of measurements taken during the session. When empty or missing, the samples received by the server are summarized.
+		- `hrv` (int, optional): The user's HRV value (ms). Defaults to the last HRV value received by the server.
 
 		Headers:
 		- `device_token` (string): The session token for the user.
 
+		Responses:
+		- If the summary was saved:
+			- Returns a `200 OK` status with the message `SESSION_SUMMARY_OK`.
+		- If there are no measurements to summarize:
+			- Returns a `400 Bad Request` status with the message `SESSION_SUMMARY_FAIL`.
+		- If the token is invalid:
+			- Returns a `400 Bad Request` status with the message `INVALID_TOKEN`.
+
 		Example Request:
 		{
 			"sessionId": "1",
@@ -491,12 +664,21 @@ def signOutSession(sessionSignData: SessionSignData, device_token: str = Header(
 			"measurements": [72, 75, 70],
 			"hrv": 50
 		}
+
+		Example Request (server-side summary):
+		{
+			"sessionId": "1",
+			"username": "username123"
+		}
 		"""
 )
 def sendSessionSummary(sessionSummaryData: SessionSummaryData, device_token: str = Header(...)):
 		if not isTokenValid(sessionSummaryData.username, device_token):
 				return PostResponse(statusCode=400, message="INVALID_TOKEN")
-		return sendSessionSummaryData(sessionSummaryData.sessionId, sessionSummaryData.username, sessionSummaryData.measurements, sessionSummaryData.hrv)
+		aggregate = sessionAggregates.get(sessionSummaryData.sessionId, sessionSummaryData.username)
+		if sendSessionSummaryData(sessionSummaryData.sessionId, sessionSummaryData.username, sessionSummaryData.measurements, sessionSummaryData.hrv, aggregate):
+				return PostResponse(statusCode=200, message="SESSION_SUMMARY_OK")
+		return PostResponse(statusCode=400, message="SESSION_SUMMARY_FAIL")
 
 @router.post(
 		"/get-session-summary/",
@@ -567,9 +749,9 @@ def getSessionSummary(sessionSignData: SessionSignData, device_token: str = Head
 		"""
 )
 async def enterSession(sessionOperationData: SessionOperation):
-		user = getUserData(sessionOperationData.username)
-		if canEnterSession(sessionOperationData.sessionId) and user is not None:
-				await event_queue.put(await getSSEPostResponse(sessionOperationData.sessionId, sessionOperationData.username, getCurrentTimeStamp(), "ENTER_SESSION", user.firstName))
+		user = await runDatabaseCall(getUserData, sessionOperationData.username)
+		if await runDatabaseCall(canEnterSession, sessionOperationData.sessionId) and user is not None:
+				broker.publish(await getSSEPostResponse(sessionOperationData.sessionId, sessionOperationData.username, getCurrentTimeStamp(), "ENTER_SESSION", user.firstName))
 				return PostResponse(statusCode=200, message="ENTER_SESSION_OK")
 		return PostResponse(statusCode=400, message="ENTER_SESSION_FAIL")
 
@@ -577,7 +759,7 @@ async def enterSession(sessionOperationData: SessionOperation):
 		"/leave-session",
 		summary="Leave Session",
 		description="""
-		Allows a user to leave a session.
+		Allows a user to leave a session. The user's session summary is written from the heart rate samples the server received.
 		
 		Request Body:
 		- `sessionId` (string): The ID of the session.
@@ -603,8 +785,11 @@ async def enterSession(sessionOperationData: SessionOperation):
 		"""
 )
 async def leaveSession(sessionOperationData: SessionOperation):
-		if canLeaveSession(sessionOperationData.sessionId, sessionOperationData.username):
-				await event_queue.put(await getSSEPostResponse(sessionOperationData.sessionId, sessionOperationData.username, getCurrentTimeStamp(), "LEAVE_SESSION"))
+		if await runDatabaseCall(canLeaveSession, sessionOperationData.sessionId, sessionOperationData.username):
+				aggregate = sessionAggregates.pop(sessionOperationData.sessionId, sessionOperationData.username)
+				if aggregate is not None:
+						await runDatabaseCall(saveSessionAggregates, sessionOperationData.sessionId, {sessionOperationData.username: aggregate})
+				broker.publish(await getSSEPostResponse(sessionOperationData.sessionId, sessionOperationData.username, getCurrentTimeStamp(), "LEAVE_SESSION"))
 				return PostResponse(statusCode=200, message="LEAVE_SESSION_OK")
 		return PostResponse(statusCode=400, message="LEAVE_SESSION_FAIL")
 # Password Recovery Methods. 
@@ -856,7 +1041,8 @@ def startSession(sessionStartData: SessionStartData):
 		"/close-session",
 		summary="Close Session",
 		description="""
-		Closes a session.
+		Closes a session. The session summaries of the users still in it are written from the heart rate samples the server received.
+		A `SESSION_CLOSED` event is sent to the session's streams, and every worker then forgets the live state of the session.
 		
 		Request Body:
 		- `sessionId` (string): The ID of the session.
@@ -879,26 +1065,208 @@ def startSession(sessionStartData: SessionStartData):
 		}
 		"""
 )
-def closeSession(sessionCloseData: SessionCloseData):
-		if attemptSessionClose(sessionCloseData):
+async def closeSession(sessionCloseData: SessionCloseData):
+		if await runDatabaseCall(attemptSessionClose, sessionCloseData):
+				aggregates = sessionAggregates.popSession(sessionCloseData.sessionId)
+				broker.publish(await getSSEPostResponse(sessionCloseData.sessionId, "", getCurrentTimeStamp(), SESSION_CLOSED))
+				await runDatabaseCall(saveSessionAggregates, sessionCloseData.sessionId, aggregates)
 				return PostResponse(statusCode=200, message="SESSION_CLOSE_OK")
 		return PostResponse(statusCode=400, message="SESSION_CLOSE_FAIL")
 
-async def event_stream(sessionId):
-    start_time = datetime.now()
-    timeout = timedelta(hours=1)  # 1-hour timeout
+def ingestHeartbeatSamples(sessionId, username, samples):
+    """
+    Stores a group of heart rate samples of a user and publishes them to the session's streams.
+
+    The group takes one buffer append, one message to the other workers and one write per stream.
+    Every timestamp is converted before anything is stored, so a sample that cannot be converted
+    rejects the whole group.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+        username (str): The user's username.
+        samples (list): (timeStamp, heartRate) tuples, timestamps in Unix time in seconds.
+
+    Raises:
+        ValueError: If a timestamp cannot be converted.
+
+    Example:
+        ingestHeartbeatSamples("1", "username123", [(1698765432, 72), (1698765433, 74)])
+    """
+    events = [
+        SSEData(sessionId=sessionId, username=username, timeStamp=getTimeStampFromUnixTime(timeStamp), event="HEARTRATE", value=str(heartRate))
+        for timeStamp, heartRate in samples
+    ]
+    heartRateSamples.addMany([(sessionId, username, timeStamp, heartRate) for timeStamp, heartRate in samples])
+    broker.publishMany(events)
+
+def ingestHRVSample(sessionId, username, hrv):
+    """
+    Stores an HRV value of a user, stamped with the time of arrival, and publishes it to the session's streams.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+        username (str): The user's username.
+        hrv (float): The HRV value (ms).
+
+    Example:
+        ingestHRVSample("1", "username123", 50)
+    """
+    addHRVSample(sessionId, username, int(time.time()), hrv)
+    broker.publish(SSEData(sessionId=sessionId, username=username, timeStamp=getCurrentTimeStamp(), event="HRV", value=str(hrv)))
+
+async def deviceSocket(websocket):
+    """
+    Serves an accepted device ingestion WebSocket until it is closed.
+
+    The device authenticates once with its first message. Its token is checked again every
+    `DEVICE_TOKEN_RECHECK_INTERVAL` seconds, which also keeps it from expiring while streaming.
+    Frames that cannot be read are answered with `INVALID_FRAME` and the connection stays open.
+
+    Parameters:
+        websocket (WebSocket): The accepted connection of the device.
+
+    Example:
+        await deviceSocket(websocket)
+    """
+    try:
+        message = await asyncio.wait_for(websocket.receive(), DEVICE_AUTHENTICATION_TIMEOUT)
+    except asyncio.TimeoutError:
+        message = {}
+    if message.get("type") == "websocket.disconnect":
+        return
+    try:
+        if message.get("text") is None:
+            raise ValueError("The authentication must be a text message")
+        authentication = DeviceAuthentication.model_validate_json(message["text"])
+    except ValueError:
+        await websocket.close(code=1008, reason="INVALID_AUTHENTICATION")
+        return
+    sessionId, username = authentication.sessionId, authentication.username
+    if not isTokenValid(username, authentication.deviceToken):
+        await websocket.close(code=1008, reason="INVALID_TOKEN")
+        return
+    if not await runDatabaseCall(canEnterSession, sessionId):
+        await websocket.close(code=1008, reason="INVALID_SESSION")
+        return
+    await websocket.send_json({"statusCode": 200, "message": "DEVICE_STREAM_OK"})
+    tokenCheckedAt = time.monotonic()
 
     while True:
-        if datetime.now() - start_time > timeout:
-            break
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        if time.monotonic() - tokenCheckedAt > DEVICE_TOKEN_RECHECK_INTERVAL:
+            if not isTokenValid(username, authentication.deviceToken):
+                await websocket.close(code=1008, reason="INVALID_TOKEN")
+                return
+            tokenCheckedAt = time.monotonic()
         try:
-            data = await asyncio.wait_for(event_queue.get(), timeout=3600)
-            if data.sessionId == sessionId:
-                yield data
-        except asyncio.TimeoutError:
-            print("Timeout: No data received for 1 hour")
-            break
-						
+            if message.get("bytes") is not None:
+                packetSessionId, packetUsername, samples = parseHeartbeatPacket(message["bytes"])
+                if (packetSessionId, packetUsername) != (sessionId, username):
+                    raise ValueError("Packet for another session or user")
+                ingestHeartbeatSamples(sessionId, username, samples)
+            else:
+                sample = DeviceSample.model_validate_json(message.get("text") or "")
+                if sample.heartRate is not None:
+                    ingestHeartbeatSamples(sessionId, username, [(int(time.time()) if sample.timeStamp is None else sample.timeStamp, sample.heartRate)])
+                if sample.hrv is not None:
+                    ingestHRVSample(sessionId, username, sample.hrv)
+        except ValueError:
+            await websocket.send_json({"statusCode": 400, "message": "INVALID_FRAME"})
+
+async def event_stream(sessionIds, policy=DEFAULT_OVERFLOW_POLICY, lastEventId=None, tick=None):
+    # Keep-alive comments and the idle/maximum lifetimes are handled by the broker's shared ticker,
+    # which closes the subscriber when the stream expires.
+    subscriber = broker.subscribeMany(sessionIds, overflowPolicy=policy, lastEventId=lastEventId, tick=tick)
+
+    try:
+        while True:
+            data = await (subscriber.getAll() if tick is None else subscriber.getBatch())
+            if data is None:
+                break
+            if data is KEEPALIVE:
+                yield KEEPALIVE_FRAME
+            elif tick is None:
+                yield b"".join(brokerEvent.frame for brokerEvent in data)
+            else:
+                yield formatBatchFrame(data)
+    finally:
+        broker.unsubscribe(subscriber)
+
+async def dashboardSocket(websocket, sessionId, policy=DEFAULT_OVERFLOW_POLICY):
+    """
+    Streams a session to an accepted dashboard WebSocket until either side closes it.
+
+    The snapshot is taken right after subscribing, with no await in between, so the dashboard
+    receives every later event exactly once. WebSocket clients do not reconnect on their own, so
+    the subscriber is exempt from the idle and maximum lifetimes of the SSE streams: it lives
+    until the dashboard disconnects.
+
+    Parameters:
+        websocket (WebSocket): The accepted connection of the dashboard.
+        sessionId (str): The ID of the session.
+        policy (str): One of `OVERFLOW_POLICIES`, applied when the dashboard falls behind.
+
+    Example:
+        await dashboardSocket(websocket, "1", COALESCE_LATEST)
+    """
+    subscriber = broker.subscribe(sessionId, overflowPolicy=policy, expires=False)
+    snapshot = liveSessions.getSnapshot(sessionId)
+    receiver = asyncio.create_task(watchSocketClose(websocket, subscriber))
+    announced = {participant.handle for participant in snapshot.participants}
+
+    try:
+        await websocket.send_text(json.dumps({"event": "SNAPSHOT", **snapshot.model_dump()}))
+        while True:
+            data = await subscriber.get()
+            if data is None:
+                break
+            if data is KEEPALIVE:
+                continue
+            if data.event == SESSION_CLOSED:
+                await websocket.send_text(json.dumps({"event": SESSION_CLOSED, "timeStamp": data.data.timeStamp}))
+                continue
+            if data.handle is None:
+                continue
+            if data.event == "ENTER_SESSION":
+                announced.add(data.handle)
+                await websocket.send_text(json.dumps({"event": "ENTER_SESSION", "handle": data.handle, "username": data.username, "name": data.data.value, "timeStamp": data.data.timeStamp}))
+            elif data.event == "LEAVE_SESSION":
+                announced.discard(data.handle)
+                await websocket.send_text(json.dumps({"event": "LEAVE_SESSION", "handle": data.handle, "username": data.username, "timeStamp": data.data.timeStamp}))
+            elif data.binaryFrame is not None:
+                if data.handle not in announced:
+                    announced.add(data.handle)
+                    await websocket.send_text(json.dumps({"event": "HANDLE", "handle": data.handle, "username": data.username}))
+                await websocket.send_bytes(data.binaryFrame)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        broker.unsubscribe(subscriber)
+
+async def watchSocketClose(websocket, subscriber):
+    """
+    Reads a dashboard WebSocket until the client disconnects, then closes its subscriber.
+
+    Dashboards only listen, so the messages they send are ignored.
+
+    Parameters:
+        websocket (WebSocket): The connection of the dashboard.
+        subscriber (SessionSubscriber): The subscriber feeding the connection.
+
+    Example:
+        receiver = asyncio.create_task(watchSocketClose(websocket, subscriber))
+    """
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except RuntimeError:
+        pass
+    finally:
+        subscriber.close()
+
 @router.get(
 		"/session/{sessionId}",
 		summary="SSE Session",
@@ -908,15 +1276,215 @@ async def event_stream(sessionId):
 		Path Parameters:
 		- `sessionId` (string): The ID of the session.
 
+		Query Parameters:
+		- `policy` (string, optional): What to do when the client falls behind and its buffer is full:
+			- `drop-oldest` (default): Discards the oldest pending events.
+			- `coalesce-latest`: Keeps only the latest pending HEARTRATE and HRV event of each user.
+			- `disconnect`: Closes the stream.
+		- `tick` (string, optional): Sends the HEARTRATE and HRV events in one batch per interval (e.g., `500ms`, `1s`, between 50ms and 10s) instead of one message per measurement. Each batch is a message whose `data` is a JSON array with the latest HEARTRATE and HRV event of each user. Other events (e.g., ENTER_SESSION, LEAVE_SESSION) are still sent immediately. `policy` is ignored in this mode.
+
+		Headers:
+		- `Last-Event-ID` (string, optional): The ID of the last event received before reconnecting. Recent events published after it are sent first. IDs are assigned by each worker, so with several workers a client reconnecting to another worker may receive again, or miss, the events of the last few milliseconds.
+
+		Responses:
+		- Returns a stream of events for the session, each with an increasing `id`.
+		- A `:keepalive` comment is sent when nothing was sent for 15 seconds.
+		- The stream is closed after 1 hour without events or after 1 hour in total; clients reconnect with `Last-Event-ID`.
+		- If the policy is unknown:
+			- Returns a `400 Bad Request` status with the message `INVALID_POLICY`.
+		- If the tick interval is invalid:
+			- Returns a `400 Bad Request` status with the message `INVALID_TICK`.
+
+		Example Request:
+		GET /session/1?policy=coalesce-latest
+		Headers:
+			Last-Event-ID: 1700000000000000
+
+		Example Response:
+		id: 1700000000000001
+		data: {"sessionId": "1", "username": "example123", "timeStamp": "2023-10-15T10:00:00", "event": "HEARTRATE", "value": "72"}
+		"""
+)
+async def session(sessionId, policy: str = DEFAULT_OVERFLOW_POLICY, tick: Optional[str] = None, last_event_id: Optional[str] = Header(None)):
+		if policy not in OVERFLOW_POLICIES:
+				return PostResponse(statusCode=400, message="INVALID_POLICY")
+		tickInterval = None
+		if tick is not None:
+				tickInterval = parseTickInterval(tick)
+				if tickInterval is None:
+						return PostResponse(statusCode=400, message="INVALID_TICK")
+		lastEventId = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+		return StreamingResponse(event_stream([sessionId], policy, lastEventId, tickInterval), media_type="text/event-stream")
+
+@router.get(
+		"/session-stream",
+		summary="SSE Multi-Session Stream",
+		description="""
+		Provides Server-Sent Events (SSE) for several sessions on a single connection.
+
+		Query Parameters:
+		- `sessionIds` (string, optional): Comma-separated IDs of the sessions to follow.
+		- `teacher` (string, optional): A teacher's username, to follow all of their active sessions. The sessions are read when the stream opens; reconnect to include sessions started later.
+		- `policy` (string, optional): The overflow policy, as in `/session/{sessionId}`.
+		- `tick` (string, optional): The batching interval, as in `/session/{sessionId}`.
+
+		Headers:
+		- `Last-Event-ID` (string, optional): The ID of the last event received before reconnecting.
+
+		Responses:
+		- Returns the events of all the sessions, in publishing order. Each event carries its `sessionId`.
+		- If neither or both of `sessionIds` and `teacher` are given, or no session is selected:
+			- Returns a `400 Bad Request` status with the message `INVALID_SESSIONS`.
+		- If the policy is unknown:
+			- Returns a `400 Bad Request` status with the message `INVALID_POLICY`.
+		- If the tick interval is invalid:
+			- Returns a `400 Bad Request` status with the message `INVALID_TICK`.
+
+		Example Request:
+		GET /session-stream?sessionIds=1,2
+
+		Example Response:
+		id: 1700000000000001
+		data: {"sessionId": "1", "username": "example123", "timeStamp": "2023-10-15T10:00:00", "event": "HEARTRATE", "value": "72"}
+
+		id: 1700000000000002
+		data: {"sessionId": "2", "username": "example456", "timeStamp": "2023-10-15T10:00:00", "event": "HEARTRATE", "value": "80"}
+		"""
+)
+async def sessionStream(sessionIds: Optional[str] = None, teacher: Optional[str] = None, policy: str = DEFAULT_OVERFLOW_POLICY, tick: Optional[str] = None, last_event_id: Optional[str] = Header(None)):
+		if (sessionIds is None) == (teacher is None):
+				return PostResponse(statusCode=400, message="INVALID_SESSIONS")
+		if policy not in OVERFLOW_POLICIES:
+				return PostResponse(statusCode=400, message="INVALID_POLICY")
+		tickInterval = None
+		if tick is not None:
+				tickInterval = parseTickInterval(tick)
+				if tickInterval is None:
+						return PostResponse(statusCode=400, message="INVALID_TICK")
+		if teacher is not None:
+				streamSessionIds = await runDatabaseCall(searchForActiveTeacherSessionIds, teacher)
+		else:
+				streamSessionIds = [sessionId.strip() for sessionId in sessionIds.split(",") if sessionId.strip()]
+		if not streamSessionIds:
+				return PostResponse(statusCode=400, message="INVALID_SESSIONS")
+		lastEventId = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+		return StreamingResponse(event_stream(streamSessionIds, policy, lastEventId, tickInterval), media_type="text/event-stream")
+
+@router.get(
+		"/session-state/{sessionId}",
+		summary="Live Session State",
+		description="""
+		Retrieves the current state of a session, kept in memory from its events.
+
+		Path Parameters:
+		- `sessionId` (string): The ID of the session.
+
 		Responses:
-		- Returns a stream of events for the session.
+		- Returns the users currently in the session with their last heart rate, HRV and timestamp. Values not received yet are `null`.
 
 		Example Request:
-		GET /session/1
+		GET /session-state/1
 
 		Example Response:
-		data: {"sessionId": "1", "username": "example123", "event": "HEARTRATE", "value": "72"}
+		{
+			"sessionId": "1",
+			"participants": [
+				{
+					"username": "username123",
+					"handle": 1,
+					"name": "John",
+					"heartRate": 72,
+					"hrv": 50,
+					"timeStamp": "2023-10-15T10:00:00"
+				}
+			]
+		}
+		"""
+)
+async def sessionState(sessionId):
+		return liveSessions.getSnapshot(sessionId)
+
+@router.websocket("/session-ws/{sessionId}")
+async def sessionWebSocket(websocket: WebSocket, sessionId: str, policy: str = DEFAULT_OVERFLOW_POLICY):
+		"""
+		WebSocket stream of a session for dashboards, with compact binary measurement frames.
+
+		Path Parameters:
+		- `sessionId` (string): The ID of the session.
+
+		Query Parameters:
+		- `policy` (string, optional): The overflow policy, as in `/session/{sessionId}`.
+
+		Messages:
+		- Text (JSON), the first one a snapshot of the session as in `/session-state/{sessionId}`:
+			- `{"event": "SNAPSHOT", "sessionId": "1", "participants": [{"username": "username123", "handle": 1, ...}]}`
+			- `{"event": "ENTER_SESSION", "handle": 2, "username": "username456", "name": "John", "timeStamp": "2023-10-15T10:00:00"}`
+			- `{"event": "LEAVE_SESSION", "handle": 2, "username": "username456", "timeStamp": "2023-10-15T10:30:00"}`
+			- `{"event": "HANDLE", "handle": 3, "username": "username789"}`: sent before the first frame of a participant not announced yet.
+			- `{"event": "SESSION_CLOSED", "timeStamp": "2023-10-15T11:00:00"}`: the session was closed.
+		- Binary, 5 bytes, little-endian (`<BHH`): event type (1 = HEARTRATE, 2 = HRV), participant handle and value (HRV rounded to whole milliseconds).
+
+		Responses:
+		- The connection stays open for as long as the dashboard is connected: unlike the SSE streams, it is not closed after 1 hour without events or in total.
+		- If the policy is unknown, the connection is closed with code 1008.
+
+		Example Binary Frame:
+		01 02 00 48 00  ->  HEARTRATE of the participant with handle 2: 72 BPM
+		"""
+		await websocket.accept()
+		if policy not in OVERFLOW_POLICIES:
+				await websocket.close(code=1008, reason="INVALID_POLICY")
+				return
+		await dashboardSocket(websocket, sessionId, policy)
+
+@router.websocket("/device-ws")
+async def deviceWebSocket(websocket: WebSocket):
+		"""
+		WebSocket for devices streaming the samples of a user during a session, without one HTTP request per sample.
+
+		Messages from the device:
+		- First message (text): the authentication, e.g. `{"username": "username123", "deviceToken": "abc123xyz", "sessionId": "1"}`.
+		- Text: `{"heartRate": 72, "timeStamp": 1698765432}`, `{"hrv": 50}` or both. `timeStamp` defaults to the time of arrival. The heart rate and timestamp have the same bounds as in `/heartbeat-batch`.
+		- Binary: a packet in the format of `/heartbeat-binary` for the same session and user.
+
+		Samples are stored and sent to the session's streams as with `/heartbeat-info`, `/heartbeat-batch` and `/hrv`.
+
+		Messages from the server:
+		- `{"statusCode": 200, "message": "DEVICE_STREAM_OK"}` once authenticated.
+		- `{"statusCode": 400, "message": "INVALID_FRAME"}` for a frame that could not be read. The connection stays open.
+
+		Responses:
+		- If the first message is missing, binary or invalid, the connection is closed with code 1008 and reason `INVALID_AUTHENTICATION`.
+		- If the token is invalid or expires, the connection is closed with code 1008 and reason `INVALID_TOKEN`.
+		- If the session is not active, the connection is closed with code 1008 and reason `INVALID_SESSION`.
+		"""
+		await websocket.accept()
+		try:
+				await deviceSocket(websocket)
+		except WebSocketDisconnect:
+				pass
+
+@router.get(
+		"/session-stats",
+		summary="SSE Session Stats",
+		description="""
+		Retrieves the counters of the session event streams.
+
+		Responses:
+		- Returns the number of open streams, how many events were dropped or coalesced, how many streams were disconnected because a client could not keep up and how many were closed after their idle or maximum lifetime.
+
+		Example Request:
+		GET /session-stats
+
+		Example Response:
+		{
+			"subscribers": 3,
+			"droppedEvents": 120,
+			"coalescedEvents": 4500,
+			"evictedSubscribers": 1,
+			"expiredSubscribers": 12
+		}
 		"""
 )
-async def session(sessionId):
-		return StreamingResponse(event_stream(sessionId), media_type="text/event-stream")
\ No newline at end of file
+async def sessionStats():
+		return SSEStats(**broker.getStats())
\ No newline at end of file
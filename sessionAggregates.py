@@ -0,0 +1,167 @@
+import math
+
+class RunningAggregate:
+    """
+    Running statistics of the heart rate of one user in one session, updated sample by sample.
+
+    The mean and variance use Welford's algorithm, so they stay accurate over long sessions
+    without keeping the samples. The last HRV value received is kept alongside.
+
+    Example:
+        aggregate = RunningAggregate()
+        for heartRate in (72, 75, 70):
+            aggregate.add(heartRate)
+        print(aggregate.mean, aggregate.maximum)  # Output: 72.33333333333333 75
+    """
+    __slots__ = ("count", "total", "minimum", "maximum", "mean", "m2", "hrv")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hrv = None
+
+    def add(self, heartRate):
+        """
+        Adds a heart rate sample.
+
+        Parameters:
+            heartRate (int): The heart rate (BPM).
+        """
+        self.count += 1
+        self.total += heartRate
+        self.minimum = heartRate if self.minimum is None else min(self.minimum, heartRate)
+        self.maximum = heartRate if self.maximum is None else max(self.maximum, heartRate)
+        delta = heartRate - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (heartRate - self.mean)
+
+    @property
+    def variance(self):
+        """
+        float: The sample variance of the heart rate, 0 with fewer than two samples.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standardDeviation(self):
+        """
+        float: The sample standard deviation of the heart rate.
+        """
+        return math.sqrt(self.variance)
+
+    def toSummaryRow(self, sessionId, username, hrv=None):
+        """
+        Returns the aggregate as a row of the `sessionSummary` table.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+            username (str): The user's username.
+            hrv (int, optional): An HRV value replacing the last one received.
+
+        Returns:
+            tuple: sessionId, username, hrCount, hrAverage, hrMaximum, hrMinimum and hrv.
+        """
+        hrv = self.hrv if hrv is None else hrv
+        return (sessionId, username, self.count, int(self.mean), self.maximum, self.minimum, None if hrv is None else round(hrv))
+
+class SessionAggregateStore:
+    """
+    Running heart rate aggregates of every user of the sessions being monitored, fed from the session events.
+
+    HEARTRATE events update the aggregate of their (sessionId, username) and HRV events record the
+    latest HRV value. The aggregates are taken out when the user leaves or the session closes and
+    written to `sessionSummary`, so the clients no longer need to upload their measurements.
+
+    Users who left a session are remembered until they enter it again: samples they send after
+    leaving (e.g., the last batch of a device) are ignored, so they cannot start a new aggregate
+    that would replace the summary written when they left. A SESSION_CLOSED event drops the
+    session, whose aggregates the worker closing it has already taken out.
+
+    Example:
+        sessionAggregates = SessionAggregateStore()
+        broker.addObserver(sessionAggregates.observe)
+        aggregate = sessionAggregates.pop("1", "username123")
+    """
+    def __init__(self):
+        self.aggregates = {}
+        self.departed = {}
+
+    def observe(self, brokerEvent):
+        """
+        Applies a session event to the aggregate of its user.
+
+        Parameters:
+            brokerEvent (BrokerEvent): The event delivered by the broker.
+        """
+        data = brokerEvent.data
+        if data.event in ("HEARTRATE", "HRV"):
+            if data.username in self.departed.get(data.sessionId, ()):
+                return
+            if data.event == "HEARTRATE":
+                self._getAggregate(data.sessionId, data.username).add(int(float(data.value)))
+            else:
+                self._getAggregate(data.sessionId, data.username).hrv = float(data.value)
+        elif data.event == "LEAVE_SESSION":
+            # The worker handling the request has already taken the aggregate out
+            self.pop(data.sessionId, data.username)
+            self.departed.setdefault(data.sessionId, set()).add(data.username)
+        elif data.event == "ENTER_SESSION":
+            self.departed.get(data.sessionId, set()).discard(data.username)
+        elif data.event == "SESSION_CLOSED":
+            self.popSession(data.sessionId)
+
+    def get(self, sessionId, username):
+        """
+        Returns the aggregate of a user in a session.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+            username (str): The user's username.
+
+        Returns:
+            RunningAggregate: The aggregate, or None if no sample was received.
+        """
+        return self.aggregates.get(sessionId, {}).get(username)
+
+    def pop(self, sessionId, username):
+        """
+        Takes out the aggregate of a user in a session.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+            username (str): The user's username.
+
+        Returns:
+            RunningAggregate: The aggregate, or None if no sample was received.
+        """
+        sessionAggregates = self.aggregates.get(sessionId)
+        if sessionAggregates is None:
+            return None
+        aggregate = sessionAggregates.pop(username, None)
+        if not sessionAggregates:
+            del self.aggregates[sessionId]
+        return aggregate
+
+    def popSession(self, sessionId):
+        """
+        Takes out the aggregates of every user of a session and forgets who left it.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+
+        Returns:
+            dict: The aggregates by username.
+        """
+        self.departed.pop(sessionId, None)
+        return self.aggregates.pop(sessionId, {})
+
+    def _getAggregate(self, sessionId, username):
+        sessionAggregates = self.aggregates.setdefault(sessionId, {})
+        aggregate = sessionAggregates.get(username)
+        if aggregate is None:
+            aggregate = sessionAggregates[username] = RunningAggregate()
+        return aggregate
@@ -0,0 +1,732 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger('uvicorn.error')
+
+# Overflow policies applied when a subscriber's buffer is full
+DROP_OLDEST = "drop-oldest"
+COALESCE_LATEST = "coalesce-latest"
+DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE_LATEST, DISCONNECT)
+
+# Maximum number of events waiting to be sent to a single subscriber
+SUBSCRIBER_BUFFER_SIZE = 256
+
+# Policy used when a subscriber does not choose one
+DEFAULT_OVERFLOW_POLICY = DROP_OLDEST
+
+# Events only worth their latest value, merged per user under the coalesce-latest policy
+COALESCIBLE_EVENTS = ("HEARTRATE", "HRV")
+
+# Event published when a session is closed. Every worker forgets the session once it is delivered.
+SESSION_CLOSED = "SESSION_CLOSED"
+
+# Number of recent events kept per session to replay to reconnecting clients
+REPLAY_BUFFER_SIZE = 512
+
+# Bounds, in seconds, of the interval between two batched frames of a ticking stream
+MIN_TICK_INTERVAL = 0.05
+MAX_TICK_INTERVAL = 10
+
+# Seconds without anything sent after which a stream receives a keep-alive comment
+KEEPALIVE_INTERVAL = 15
+
+# Seconds without any event after which a stream is closed
+STREAM_IDLE_TIMEOUT = 3600
+
+# Seconds after which a stream is closed even if it is active. Clients reconnect with the
+# ID of the last event they received.
+STREAM_MAX_LIFETIME = 3600
+
+# Seconds between two checks of the open streams by the broker's ticker
+TICKER_INTERVAL = 5
+
+# Seconds without any event after which a session nobody follows is forgotten, together with
+# its replay buffer and the state its observers keep
+SESSION_IDLE_TIMEOUT = 6 * 3600
+
+# Returned by `get` and `getBatch` when a keep-alive comment must be sent
+KEEPALIVE = object()
+
+# SSE comment sent to keep quiet streams open through proxies
+KEEPALIVE_FRAME = b":keepalive\n\n"
+
+# Outcomes of delivering an event to a subscriber
+DELIVERED = "delivered"
+COALESCED = "coalesced"
+DROPPED = "dropped"
+EVICTED = "evicted"
+
+def encodeEvent(event):
+    """
+    Serializes an event to JSON.
+
+    Parameters:
+        event (SSEData): The event to serialize.
+
+    Returns:
+        bytes: The event as UTF-8 encoded JSON.
+
+    Example:
+        payload = encodeEvent(SSEData(sessionId="1", username="example123", timeStamp="10000", event="HEARTRATE", value="72"))
+    """
+    return event.model_dump_json().encode()
+
+class BrokerEvent:
+    """
+    An event published through the broker, tagged with its event ID and framed once for every subscriber.
+
+    Event IDs increase monotonically across every session of the broker. They are based on the
+    publishing time in microseconds, so IDs issued after a server restart are still greater than
+    the ones a reconnecting client has already seen. Each worker assigns its own IDs to the events
+    it delivers, so the same event has slightly different IDs in different workers: a client
+    reconnecting to another worker with `Last-Event-ID` may receive again, or miss, the events
+    delivered within a few milliseconds of its last one.
+
+    The event is serialized a single time into `payload` and `frame`, an immutable SSE message
+    with `id` and `data` fields, and that same buffer is written to every subscriber's connection.
+
+    Parameters:
+        id (int): The event ID.
+        data (SSEData): The event.
+        payload (bytes): The event serialized with `encodeEvent`.
+
+    Example:
+        brokerEvent = BrokerEvent(1700000000000000, event, encodeEvent(event))
+        brokerEvent.frame
+        # id: 1700000000000000
+        # data: {"sessionId":"1","username":"example123","timeStamp":"2023-10-15T10:00:00","event":"HEARTRATE","value":"72"}
+    """
+    __slots__ = ("id", "data", "payload", "frame", "handle", "binaryFrame")
+
+    def __init__(self, id, data, payload):
+        self.id = id
+        self.data = data
+        self.payload = payload
+        self.frame = b"id: %d\ndata: %s\n\n" % (id, payload)
+        # Set by the live session state: the participant's handle and, for HEARTRATE and HRV,
+        # the binary dashboard frame.
+        self.handle = None
+        self.binaryFrame = None
+
+    @property
+    def sessionId(self):
+        return self.data.sessionId
+
+    @property
+    def username(self):
+        return self.data.username
+
+    @property
+    def event(self):
+        return self.data.event
+
+class SessionSubscriber:
+    """
+    A consumer of the events of one or more sessions (e.g., an SSE connection) with a bounded buffer.
+
+    The overflow policy decides how the buffer stays bounded:
+    - `drop-oldest`: when the buffer is full, the oldest buffered event is discarded to make room.
+    - `coalesce-latest`: a HEARTRATE or HRV event replaces the still unsent event of the same type,
+      session and user, which moves to the end of the buffer so events stay in publishing order;
+      when the buffer is full anyway, the oldest event is discarded.
+    - `disconnect`: when the buffer is full, the subscriber is closed and removed from the broker.
+
+    Parameters:
+        sessionIds (tuple): The IDs of the sessions the subscriber listens to.
+        bufferSize (int): The maximum number of buffered events.
+        overflowPolicy (str): One of `OVERFLOW_POLICIES`.
+        expires (bool): Whether the broker's ticker closes the subscriber after its idle or maximum lifetime.
+
+    Example:
+        subscriber = broker.subscribe("1", overflowPolicy=COALESCE_LATEST)
+        event = await subscriber.get()
+    """
+    def __init__(self, sessionIds, bufferSize=SUBSCRIBER_BUFFER_SIZE, overflowPolicy=DEFAULT_OVERFLOW_POLICY, expires=True):
+        if overflowPolicy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflowPolicy}")
+        self.sessionIds = tuple(sessionIds)
+        self.bufferSize = bufferSize
+        self.overflowPolicy = overflowPolicy
+        self.expires = expires
+        self.closed = False
+        self.createdAt = time.monotonic()
+        self.lastEventAt = self.createdAt
+        self.lastWriteAt = self.createdAt
+        self._keepalive = False
+        self._buffer = deque()
+        self._latest = {}
+        self._wakeup = asyncio.Event()
+
+    def deliver(self, event):
+        """
+        Adds an event to the subscriber's buffer, applying the overflow policy.
+
+        Parameters:
+            event (BrokerEvent): The event to deliver.
+
+        Returns:
+            str: DELIVERED, COALESCED, DROPPED (an older event was discarded) or EVICTED.
+        """
+        if self.closed:
+            return EVICTED
+        key = (event.sessionId, event.username, event.event)
+        if self.overflowPolicy == COALESCE_LATEST and key in self._latest:
+            # The newer event takes the place of the older one at the end of the buffer, so it
+            # is not sent before the events published in between
+            slot = self._latest[key]
+            if slot is not self._buffer[-1]:
+                self._buffer.remove(slot)
+                self._buffer.append(slot)
+            slot[0] = event
+            return COALESCED
+        outcome = DELIVERED
+        if len(self._buffer) >= self.bufferSize:
+            if self.overflowPolicy == DISCONNECT:
+                self.close()
+                return EVICTED
+            self._forget(self._buffer.popleft())
+            outcome = DROPPED
+        slot = [event]
+        if self.overflowPolicy == COALESCE_LATEST and event.event in COALESCIBLE_EVENTS:
+            self._latest[key] = slot
+        self._buffer.append(slot)
+        self._notify(event)
+        return outcome
+
+    async def get(self):
+        """
+        Waits for the next event delivered to the subscriber.
+
+        Returns:
+            BrokerEvent: The next event, KEEPALIVE when the broker's ticker asks for a keep-alive
+                comment, or None once the subscriber has been closed.
+        """
+        while not self._buffer:
+            if self.closed:
+                return None
+            if self._keepalive:
+                return self._takeKeepalive()
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        slot = self._buffer.popleft()
+        self._forget(slot)
+        self.lastEventAt = self.lastWriteAt = time.monotonic()
+        return slot[0]
+
+    async def getAll(self):
+        """
+        Waits for the next event delivered to the subscriber and takes every event buffered with it,
+        so that events published together are written to the client together.
+
+        Returns:
+            list: The buffered BrokerEvents in delivery order, KEEPALIVE when the broker's ticker asks
+                for a keep-alive comment, or None once the subscriber has been closed.
+        """
+        while not self._buffer:
+            if self.closed:
+                return None
+            if self._keepalive:
+                return self._takeKeepalive()
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._takeAll()
+
+    def keepalive(self):
+        """
+        Asks the consumer of the subscriber to send a keep-alive comment.
+        """
+        self._keepalive = True
+        self._wakeup.set()
+
+    def close(self):
+        """
+        Closes the subscriber. Pending `get` calls return None.
+        """
+        self.closed = True
+        self._buffer.clear()
+        self._latest.clear()
+        self._wakeup.set()
+
+    def _notify(self, event):
+        self._wakeup.set()
+
+    def _takeKeepalive(self):
+        self._keepalive = False
+        self.lastWriteAt = time.monotonic()
+        return KEEPALIVE
+
+    def _takeAll(self):
+        events = [slot[0] for slot in self._buffer]
+        self._buffer.clear()
+        self._latest.clear()
+        self._keepalive = False
+        self.lastEventAt = self.lastWriteAt = time.monotonic()
+        return events
+
+    def _forget(self, slot):
+        key = (slot[0].sessionId, slot[0].username, slot[0].event)
+        if self._latest.get(key) is slot:
+            del self._latest[key]
+
+class TickSubscriber(SessionSubscriber):
+    """
+    A subscriber that receives the HEARTRATE and HRV events of its session in batches, once per tick.
+
+    Between two ticks only the latest HEARTRATE and HRV event of each user and session is kept, as with the
+    `coalesce-latest` policy. Every other event (e.g., ENTER_SESSION, LEAVE_SESSION) wakes the
+    subscriber right away, and the pending measurements are sent along with it so that the
+    client still sees the events in order.
+
+    Parameters:
+        sessionIds (tuple): The IDs of the sessions the subscriber listens to.
+        tick (float): Seconds between two batches.
+        bufferSize (int): The maximum number of buffered events.
+
+    Example:
+        subscriber = broker.subscribe("1", tick=0.5)
+        events = await subscriber.getBatch()
+    """
+    def __init__(self, sessionIds, tick, bufferSize=SUBSCRIBER_BUFFER_SIZE):
+        super().__init__(sessionIds, bufferSize, COALESCE_LATEST)
+        self.tick = tick
+        self._nextTick = None
+
+    async def getBatch(self):
+        """
+        Waits for the next tick, or for an event that must be sent immediately, and takes every buffered event.
+
+        Returns:
+            list: The buffered BrokerEvents in delivery order, KEEPALIVE when the broker's ticker
+                asks for a keep-alive comment, or None once the subscriber has been closed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._nextTick is None:
+            self._nextTick = loop.time() + self.tick
+        while True:
+            if self.closed:
+                return None
+            if self._keepalive and not self._buffer:
+                return self._takeKeepalive()
+            remaining = self._nextTick - loop.time()
+            if remaining <= 0:
+                self._nextTick = max(self._nextTick + self.tick, loop.time())
+                if self._buffer:
+                    return self._takeAll()
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                continue
+            if self._buffer and not self.closed and self._hasUrgentEvent():
+                return self._takeAll()
+
+    def _notify(self, event):
+        if event.event not in COALESCIBLE_EVENTS:
+            self._wakeup.set()
+
+    def _hasUrgentEvent(self):
+        return any(slot[0].event not in COALESCIBLE_EVENTS for slot in self._buffer)
+
+def formatBatchFrame(events):
+    """
+    Frames a batch of events taken from a `TickSubscriber` into a single chunk written to the client.
+
+    Consecutive HEARTRATE and HRV events are merged into one SSE message whose `data` is a JSON
+    array of the events and whose `id` is the highest ID among them. Every other event keeps its
+    own message.
+
+    Parameters:
+        events (list): The BrokerEvents of the batch.
+
+    Returns:
+        bytes: The SSE messages of the batch.
+
+    Example:
+        frame = formatBatchFrame(await subscriber.getBatch())
+        # id: 1700000000000002
+        # data: [{"sessionId":"1","username":"a","timeStamp":"2023-10-15T10:00:00","event":"HEARTRATE","value":"72"},{"sessionId":"1","username":"b","timeStamp":"2023-10-15T10:00:00","event":"HRV","value":"50"}]
+    """
+    frames = []
+    measurements = []
+    for brokerEvent in events:
+        if brokerEvent.event in COALESCIBLE_EVENTS:
+            measurements.append(brokerEvent)
+            continue
+        if measurements:
+            frames.append(_formatMeasurements(measurements))
+            measurements = []
+        frames.append(brokerEvent.frame)
+    if measurements:
+        frames.append(_formatMeasurements(measurements))
+    return b"".join(frames)
+
+def _formatMeasurements(measurements):
+    lastId = max(brokerEvent.id for brokerEvent in measurements)
+    return b"id: %d\ndata: [%s]\n\n" % (lastId, b",".join(brokerEvent.payload for brokerEvent in measurements))
+
+def parseTickInterval(value):
+    """
+    Parses the tick interval of a batched stream.
+
+    Parameters:
+        value (str): A duration in milliseconds ("500ms", "500") or seconds ("1s", "0.5s").
+
+    Returns:
+        float: The interval in seconds, or None if the value is invalid or outside
+            `MIN_TICK_INTERVAL` and `MAX_TICK_INTERVAL`.
+
+    Example:
+        tick = parseTickInterval("500ms")  # Output: 0.5
+    """
+    value = value.strip().lower()
+    try:
+        if value.endswith("ms"):
+            tick = float(value[:-2]) / 1000
+        elif value.endswith("s"):
+            tick = float(value[:-1])
+        else:
+            tick = float(value) / 1000
+    except ValueError:
+        return None
+    if not MIN_TICK_INTERVAL <= tick <= MAX_TICK_INTERVAL:
+        return None
+    return tick
+
+class SessionBroker:
+    """
+    Publish/subscribe hub delivering session events to every subscriber of that session.
+
+    Each published event is handed to all the subscribers of its `sessionId` and to no one else,
+    so any number of dashboards can follow the same session and several sessions can be live at
+    the same time. A single subscriber may also follow several sessions at once. The last `REPLAY_BUFFER_SIZE` events of each session are kept in a ring buffer
+    and replayed to subscribers reconnecting with the ID of the last event they received.
+
+    A single ticker task looks after every open stream: it asks idle streams for a keep-alive
+    comment every `KEEPALIVE_INTERVAL` seconds and closes streams that received no event for
+    `STREAM_IDLE_TIMEOUT` seconds or have been open for `STREAM_MAX_LIFETIME` seconds. It also
+    forgets the sessions without subscribers that received no event for `SESSION_IDLE_TIMEOUT`
+    seconds, so events posted for sessions that never start or are never closed do not keep
+    memory forever.
+
+    Example:
+        broker = SessionBroker()
+        subscriber = broker.subscribe("1")
+        broker.publish(SSEData(sessionId="1", username="example123", timeStamp="10000", event="HEARTRATE", value="72"))
+        event = await subscriber.get()
+        broker.unsubscribe(subscriber)
+    """
+    def __init__(self):
+        self.subscribers = {}
+        self.stats = {"droppedEvents": 0, "coalescedEvents": 0, "evictedSubscribers": 0, "expiredSubscribers": 0}
+        self.recentEvents = {}
+        self.lastEventAt = {}
+        self.lastEventId = 0
+        self.transport = None
+        self.ticker = None
+        self.observers = []
+        self.sessionCleaners = []
+
+    def subscribe(self, sessionId, bufferSize=SUBSCRIBER_BUFFER_SIZE, overflowPolicy=DEFAULT_OVERFLOW_POLICY, lastEventId=None, tick=None, expires=True):
+        """
+        Registers a new subscriber for a session.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+            bufferSize (int): The maximum number of events buffered for the subscriber.
+            overflowPolicy (str): One of `OVERFLOW_POLICIES`, applied when the buffer is full.
+            lastEventId (int, optional): The ID of the last event the client received. Buffered
+                events published after it are delivered to the new subscriber first.
+            tick (float, optional): Seconds between two batches of HEARTRATE and HRV events. When
+                given, a `TickSubscriber` is created and `overflowPolicy` is ignored.
+            expires (bool): Whether the ticker closes the subscriber after `STREAM_IDLE_TIMEOUT`
+                without events or `STREAM_MAX_LIFETIME`. Subscribers of connections without
+                automatic reconnection (e.g., WebSockets) pass False.
+
+        Returns:
+            SessionSubscriber: The subscriber receiving the session's events.
+        """
+        return self.subscribeMany([sessionId], bufferSize, overflowPolicy, lastEventId, tick, expires)
+
+    def subscribeMany(self, sessionIds, bufferSize=SUBSCRIBER_BUFFER_SIZE, overflowPolicy=DEFAULT_OVERFLOW_POLICY, lastEventId=None, tick=None, expires=True):
+        """
+        Registers a new subscriber receiving the events of several sessions, in publishing order.
+
+        Parameters:
+            sessionIds (list): The IDs of the sessions.
+            bufferSize (int): The maximum number of events buffered for the subscriber.
+            overflowPolicy (str): One of `OVERFLOW_POLICIES`, applied when the buffer is full.
+            lastEventId (int, optional): The ID of the last event the client received. Buffered
+                events of the sessions published after it are delivered to the new subscriber first.
+            tick (float, optional): Seconds between two batches of HEARTRATE and HRV events.
+            expires (bool): Whether the ticker closes the subscriber after its idle or maximum lifetime.
+
+        Returns:
+            SessionSubscriber: The subscriber receiving the sessions' events.
+
+        Example:
+            subscriber = broker.subscribeMany(["1", "2"])
+        """
+        sessionIds = tuple(dict.fromkeys(sessionIds))
+        if tick is None:
+            subscriber = SessionSubscriber(sessionIds, bufferSize, overflowPolicy, expires)
+        else:
+            subscriber = TickSubscriber(sessionIds, tick, bufferSize)
+        if lastEventId is not None:
+            missedEvents = [
+                brokerEvent
+                for sessionId in sessionIds
+                for brokerEvent in self.recentEvents.get(sessionId, ())
+                if brokerEvent.id > lastEventId
+            ]
+            for brokerEvent in sorted(missedEvents, key=lambda brokerEvent: brokerEvent.id):
+                subscriber.deliver(brokerEvent)
+        for sessionId in sessionIds:
+            self.subscribers.setdefault(sessionId, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Removes a subscriber. Events published afterwards are no longer delivered to it.
+
+        Parameters:
+            subscriber (SessionSubscriber): The subscriber to remove.
+        """
+        for sessionId in subscriber.sessionIds:
+            sessionSubscribers = self.subscribers.get(sessionId)
+            if sessionSubscribers is None:
+                continue
+            sessionSubscribers.discard(subscriber)
+            if not sessionSubscribers:
+                del self.subscribers[sessionId]
+
+    def addObserver(self, observer):
+        """
+        Registers a function called with every event delivered in this worker, whether it was
+        published locally or received from another worker.
+
+        Parameters:
+            observer (callable): Called with the BrokerEvent. Exceptions it raises are logged and ignored.
+
+        Example:
+            broker.addObserver(lambda brokerEvent: print(brokerEvent.event))
+        """
+        self.observers.append(observer)
+
+    def addSessionCleaner(self, cleaner):
+        """
+        Registers a function called with the ID of every session the broker forgets, so state kept
+        by an observer is dropped with it.
+
+        Parameters:
+            cleaner (callable): Called with the session ID. Exceptions it raises are logged and ignored.
+
+        Example:
+            broker.addSessionCleaner(liveSessions.clearSession)
+        """
+        self.sessionCleaners.append(cleaner)
+
+    def startTransport(self, transport):
+        """
+        Connects the broker to the other workers of the server.
+
+        Events published in this worker are sent through the transport, and events received from
+        it are delivered to the local subscribers.
+
+        Parameters:
+            transport (LocalEventTransport): The transport shared by the workers.
+        """
+        self.transport = transport
+        transport.start(self.deliver)
+
+    def stopTransport(self):
+        """
+        Disconnects the broker from the other workers.
+        """
+        if self.transport is not None:
+            self.transport.stop()
+            self.transport = None
+
+    def startTicker(self, interval=TICKER_INTERVAL, keepaliveInterval=KEEPALIVE_INTERVAL, idleTimeout=STREAM_IDLE_TIMEOUT, maxLifetime=STREAM_MAX_LIFETIME):
+        """
+        Starts the task sending keep-alive comments to idle streams, closing expired ones and
+        forgetting idle sessions.
+
+        Parameters:
+            interval (float): Seconds between two checks of the open streams.
+            keepaliveInterval (float): Seconds without anything sent before a keep-alive comment.
+            idleTimeout (float): Seconds without any event before a stream is closed.
+            maxLifetime (float): Seconds after which a stream is closed.
+        """
+        self.ticker = asyncio.create_task(self._runTicker(interval, keepaliveInterval, idleTimeout, maxLifetime))
+
+    async def stopTicker(self):
+        """
+        Stops the ticker task.
+        """
+        if self.ticker is not None:
+            self.ticker.cancel()
+            try:
+                await self.ticker
+            except asyncio.CancelledError:
+                pass
+            self.ticker = None
+
+    def checkSubscribers(self, keepaliveInterval=KEEPALIVE_INTERVAL, idleTimeout=STREAM_IDLE_TIMEOUT, maxLifetime=STREAM_MAX_LIFETIME):
+        """
+        Asks idle subscribers for a keep-alive comment and closes the expired ones. Subscribers
+        created with `expires=False` are never closed by the ticker.
+
+        Parameters:
+            keepaliveInterval (float): Seconds without anything sent before a keep-alive comment.
+            idleTimeout (float): Seconds without any event before a subscriber is closed.
+            maxLifetime (float): Seconds after which a subscriber is closed.
+
+        Returns:
+            int: The number of subscribers closed.
+        """
+        now = time.monotonic()
+        expired = 0
+        for subscriber in self._allSubscribers():
+            if subscriber.expires and (now - subscriber.createdAt >= maxLifetime or now - subscriber.lastEventAt >= idleTimeout):
+                subscriber.close()
+                self.unsubscribe(subscriber)
+                expired += 1
+            elif now - subscriber.lastWriteAt >= keepaliveInterval:
+                subscriber.keepalive()
+        self.stats["expiredSubscribers"] += expired
+        return expired
+
+    def checkSessions(self, idleTimeout=SESSION_IDLE_TIMEOUT):
+        """
+        Forgets the sessions without subscribers that received no event for `idleTimeout` seconds.
+
+        Parameters:
+            idleTimeout (float): Seconds without any event before a session is forgotten.
+
+        Returns:
+            int: The number of sessions forgotten.
+        """
+        now = time.monotonic()
+        idleSessions = [
+            sessionId
+            for sessionId, lastEventAt in self.lastEventAt.items()
+            if now - lastEventAt >= idleTimeout and sessionId not in self.subscribers
+        ]
+        for sessionId in idleSessions:
+            self.clearSession(sessionId)
+        return len(idleSessions)
+
+    async def _runTicker(self, interval, keepaliveInterval, idleTimeout, maxLifetime):
+        while True:
+            await asyncio.sleep(interval)
+            self.checkSubscribers(keepaliveInterval, idleTimeout, maxLifetime)
+            self.checkSessions()
+
+    def publish(self, event):
+        """
+        Publishes an event to the subscribers of its session in every worker.
+
+        Parameters:
+            event (SSEData): The event to publish.
+
+        Returns:
+            int: The number of subscribers of this worker the event was delivered to.
+        """
+        payload = encodeEvent(event)
+        delivered = self.deliver(event, payload)
+        if self.transport is not None:
+            self.transport.send(payload)
+        return delivered
+
+    def publishMany(self, events):
+        """
+        Publishes a group of events, e.g. the samples of a batch upload, to the subscribers of their
+        sessions in every worker. The group is sent to the other workers in as few messages as possible.
+
+        Parameters:
+            events (list): The SSEData events to publish, in order.
+
+        Returns:
+            int: The number of deliveries to subscribers of this worker.
+        """
+        payloads = [encodeEvent(event) for event in events]
+        delivered = 0
+        for event, payload in zip(events, payloads):
+            delivered += self.deliver(event, payload)
+        if self.transport is not None:
+            self.transport.sendMany(payloads)
+        return delivered
+
+    def deliver(self, event, payload=None):
+        """
+        Assigns an ID to an event, keeps it for replay and delivers it to every subscriber of its session in this worker.
+
+        A SESSION_CLOSED event is delivered like any other, then the session is forgotten with `clearSession`.
+
+        Parameters:
+            event (SSEData): The event to deliver.
+            payload (bytes, optional): The event already serialized with `encodeEvent`.
+
+        Returns:
+            int: The number of subscribers the event was delivered to.
+        """
+        self.lastEventId = max(self.lastEventId + 1, time.time_ns() // 1000)
+        brokerEvent = BrokerEvent(self.lastEventId, event, payload if payload is not None else encodeEvent(event))
+        recentEvents = self.recentEvents.get(event.sessionId)
+        if recentEvents is None:
+            recentEvents = self.recentEvents[event.sessionId] = deque(maxlen=REPLAY_BUFFER_SIZE)
+        recentEvents.append(brokerEvent)
+        self.lastEventAt[event.sessionId] = time.monotonic()
+        for observer in self.observers:
+            try:
+                observer(brokerEvent)
+            except Exception as e:
+                logger.error(f"Session event observer failed: {e}")
+        delivered = 0
+        for subscriber in list(self.subscribers.get(event.sessionId, ())):
+            outcome = subscriber.deliver(brokerEvent)
+            if outcome == EVICTED:
+                self.stats["evictedSubscribers"] += 1
+                self.unsubscribe(subscriber)
+                continue
+            if outcome == DROPPED:
+                self.stats["droppedEvents"] += 1
+            elif outcome == COALESCED:
+                self.stats["coalescedEvents"] += 1
+            delivered += 1
+        if event.event == SESSION_CLOSED:
+            self.clearSession(event.sessionId)
+        return delivered
+
+    def clearSession(self, sessionId):
+        """
+        Forgets a session that has ended or stayed idle: its events kept for replay and, through
+        the session cleaners, the state of the observers.
+
+        Parameters:
+            sessionId (str): The ID of the session.
+        """
+        self.recentEvents.pop(sessionId, None)
+        self.lastEventAt.pop(sessionId, None)
+        for cleaner in self.sessionCleaners:
+            try:
+                cleaner(sessionId)
+            except Exception as e:
+                logger.error(f"Session cleaner failed: {e}")
+
+    def getStats(self):
+        """
+        Returns the broker counters.
+
+        Returns:
+            dict: The number of current subscribers and the counters of dropped events, coalesced
+                events, evicted subscribers and expired subscribers since the server started.
+        """
+        return {"subscribers": len(self._allSubscribers()), **self.stats}
+
+    def _allSubscribers(self):
+        return set().union(*self.subscribers.values())
@@ -26,6 +26,8 @@ CREATE TABLE IF NOT EXISTS session (
    hour INTEGER NOT NULL,                      -- Hour of the session
    spots INTEGER NOT NULL,                      -- Number of available spots in the session
    isActive INTEGER DEFAULT 0,                 -- Indicates if the session is active (0 = inactive, 1 = active, -1 = finished)
+   sessionDate TEXT,                           -- Date of the session as "yyyy-mm-dd", used for sorting and filtering
+   filledSpots INTEGER NOT NULL DEFAULT 0,     -- Number of users signed up for the session (maintained by triggers)
    FOREIGN KEY (teacher) REFERENCES teacher(username) -- Relationship to the teacher table
 );
 
@@ -50,4 +52,53 @@ CREATE TABLE IF NOT EXISTS sessionSummary (
    PRIMARY KEY (sessionId, username),          -- Composite Primary Key (sessionId + username)
    FOREIGN KEY (username) REFERENCES user(username), -- Relationship to the user table
    FOREIGN KEY (sessionId) REFERENCES session(sessionId) -- Relationship to the session table
-);
\ No newline at end of file
+);
+
+-- Table to store the raw heart rate samples received during sessions
+CREATE TABLE IF NOT EXISTS heartRateSample (
+   sessionId INTEGER NOT NULL,                 -- Session ID (references session.sessionId)
+   username TEXT NOT NULL,                     -- User's username (references user.username)
+   ts INTEGER NOT NULL,                        -- Timestamp of the sample (Unix time in seconds)
+   hr INTEGER NOT NULL                         -- Heart rate (BPM)
+);
+
+-- Table to store the raw HRV samples received during sessions
+CREATE TABLE IF NOT EXISTS hrvSample (
+   sessionId INTEGER NOT NULL,                 -- Session ID (references session.sessionId)
+   username TEXT NOT NULL,                     -- User's username (references user.username)
+   ts INTEGER NOT NULL,                        -- Timestamp of the sample (Unix time in seconds)
+   hrv REAL NOT NULL                           -- Heart rate variability (ms)
+);
+
+-- Indexes on the columns used by the most frequent lookups
+CREATE INDEX IF NOT EXISTS sessionSigningUsernameIndex ON sessionSigning (username);
+CREATE INDEX IF NOT EXISTS sessionTeacherActiveIndex ON session (teacher, isActive);
+CREATE INDEX IF NOT EXISTS userEmailIndex ON user (email);
+CREATE INDEX IF NOT EXISTS sessionSummaryUsernameIndex ON sessionSummary (username);
+CREATE INDEX IF NOT EXISTS sessionDateIndex ON session (sessionDate);
+CREATE INDEX IF NOT EXISTS heartRateSampleIndex ON heartRateSample (sessionId, username, ts);
+CREATE INDEX IF NOT EXISTS hrvSampleIndex ON hrvSample (sessionId, username, ts);
+
+-- Fills the sortable date of sessions inserted without one
+CREATE TRIGGER IF NOT EXISTS sessionDateInsertTrigger
+AFTER INSERT ON session
+WHEN NEW.sessionDate IS NULL
+BEGIN
+   UPDATE session SET sessionDate = substr(NEW.date, 7, 4) || '-' || substr(NEW.date, 4, 2) || '-' || substr(NEW.date, 1, 2) WHERE sessionId = NEW.sessionId;
+END;
+
+-- Keep session.filledSpots in sync with sessionSigning
+CREATE TRIGGER IF NOT EXISTS sessionSigningInsertTrigger
+AFTER INSERT ON sessionSigning
+BEGIN
+   UPDATE session SET filledSpots = filledSpots + 1 WHERE sessionId = NEW.sessionId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sessionSigningDeleteTrigger
+AFTER DELETE ON sessionSigning
+BEGIN
+   UPDATE session SET filledSpots = filledSpots - 1 WHERE sessionId = OLD.sessionId;
+END;
+
+-- Schema version matching the last migration in databaseMigrations.py
+PRAGMA user_version = 5;
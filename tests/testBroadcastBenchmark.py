@@ -0,0 +1,116 @@
+import asyncio
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dataModels import *
+from sessionBroker import *
+import sessionBroker
+
+NUM_EVENTS = 200
+SUBSCRIBER_COUNTS = (1, 10, 100, 1000)
+
+# Runs of each measurement, the fastest one is kept to smooth out scheduling noise
+REPEATS = 3
+
+def createEvent(i):
+    return SSEData(sessionId="1", username="example123", timeStamp=str(10000 + i), event="HEARTRATE", value=str(60 + i % 40))
+
+class EncodeTimer:
+    # Wraps the broker's serialization (encodeEvent and the framing done by BrokerEvent) to count
+    # its calls and the CPU time spent in it
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0
+        self.encodeEvent = sessionBroker.encodeEvent
+        self.brokerEvent = sessionBroker.BrokerEvent
+
+    def __enter__(self):
+        sessionBroker.encodeEvent = self.timed(self.encodeEvent, count=True)
+        sessionBroker.BrokerEvent = self.timed(self.brokerEvent, count=False)
+        return self
+
+    def __exit__(self, *exc):
+        sessionBroker.encodeEvent = self.encodeEvent
+        sessionBroker.BrokerEvent = self.brokerEvent
+
+    def timed(self, function, count):
+        def wrapper(*args):
+            start = time.process_time()
+            result = function(*args)
+            self.seconds += time.process_time() - start
+            self.calls += count
+            return result
+        return wrapper
+
+async def drain(subscribers, frameOf):
+    # Empties every subscriber the way event_stream does, turning each event into the bytes written to the client
+    written = 0
+    for subscriber in subscribers:
+        for brokerEvent in await subscriber.getAll():
+            written += len(frameOf(brokerEvent))
+    return written
+
+def perSubscriberFrame(brokerEvent):
+    # Previous behaviour: every subscriber serialized the event again
+    return f"id: {brokerEvent.id}\ndata: {brokerEvent.data.model_dump_json()}\n\n".encode()
+
+def sharedFrame(brokerEvent):
+    return brokerEvent.frame
+
+async def runBroadcast(numSubscribers, frameOf):
+    # Returns the total cost and the encoding cost per event, and the number of encodings per event
+    broker = SessionBroker()
+    subscribers = [broker.subscribe("1", bufferSize=NUM_EVENTS) for _ in range(numSubscribers)]
+    events = [createEvent(i) for i in range(NUM_EVENTS)]
+    # Collections triggered by the subscribers' allocations would otherwise land in the timed section
+    gc.collect()
+    gc.disable()
+    try:
+        with EncodeTimer() as timer:
+            start = time.process_time()
+            for event in events:
+                broker.publish(event)
+            await drain(subscribers, frameOf)
+            elapsed = time.process_time() - start
+    finally:
+        gc.enable()
+    return elapsed / NUM_EVENTS, timer.seconds / NUM_EVENTS, timer.calls / NUM_EVENTS
+
+async def bestOf(numSubscribers, frameOf):
+    runs = [await runBroadcast(numSubscribers, frameOf) for _ in range(REPEATS)]
+    return min(run[0] for run in runs), min(run[1] for run in runs), max(run[2] for run in runs)
+
+async def main():
+    print(f"Events per run: {NUM_EVENTS}")
+    print(f"{'Subscribers':>11} {'Per subscriber (us/event)':>26} {'Shared frame (us/event)':>24} {'Speedup':>8} {'Encoding (us/event)':>20}")
+    results = {}
+    for numSubscribers in SUBSCRIBER_COUNTS:
+        perSubscriber, _, _ = await bestOf(numSubscribers, perSubscriberFrame)
+        shared, encodeCost, encodeCalls = await bestOf(numSubscribers, sharedFrame)
+        results[numSubscribers] = (perSubscriber, shared, encodeCost, encodeCalls)
+        print(f"{numSubscribers:>11} {perSubscriber * 1e6:>26.1f} {shared * 1e6:>24.1f} {perSubscriber / shared:>7.1f}x {encodeCost * 1e6:>20.1f}")
+
+    # Each event is encoded once whatever the number of subscribers, so the encoding cost per event
+    # stays flat and only the buffering grows with the audience. The encoding times above are only
+    # reported: they are too noisy to assert on.
+    for numSubscribers, (_, _, _, encodeCalls) in results.items():
+        assert encodeCalls == 1, f"{encodeCalls} encodings per event with {numSubscribers} subscribers"
+    print("Every event is encoded once whatever the number of subscribers")
+
+    perSubscriber, shared, _, _ = results[SUBSCRIBER_COUNTS[-1]]
+    assert shared < perSubscriber, "Sharing the frame did not reduce the broadcast cost"
+
+    # Every subscriber receives the very same encoded frame
+    broker = SessionBroker()
+    subscribers = [broker.subscribe("1") for _ in range(SUBSCRIBER_COUNTS[-1])]
+    broker.publish(createEvent(0))
+    frames = {id((await subscriber.get()).frame) for subscriber in subscribers}
+    assert len(frames) == 1, f"{len(frames)} frames created for one event"
+    print("Every subscriber shares the same encoded frame")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from databaseAsync import *
+
+# Query that keeps SQLite busy for a while without touching any table
+SLOW_QUERY = """
+WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter WHERE x < 3000000)
+SELECT COUNT(*) FROM counter
+"""
+
+# The query does not need any table, so the test uses in-memory databases instead of the server's file
+pool = ConnectionPool(":memory:")
+
+def slowQuery():
+    connection = pool.acquire()
+    try:
+        return connection.execute(SLOW_QUERY).fetchone()[0]
+    finally:
+        pool.release(connection)
+
+async def measureLoopLag(stopEvent, interval=0.01):
+    # Sleeps in short steps and records how late the event loop wakes up each time
+    maxLag = 0
+    while not stopEvent.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        maxLag = max(maxLag, time.perf_counter() - start - interval)
+    return maxLag
+
+async def runSlowQueries(blocking, numQueries):
+    stopEvent = asyncio.Event()
+    lagTask = asyncio.create_task(measureLoopLag(stopEvent))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if blocking:
+        for _ in range(numQueries):
+            slowQuery()
+            await asyncio.sleep(0)
+    else:
+        await asyncio.gather(*[runDatabaseCall(slowQuery) for _ in range(numQueries)])
+    elapsed = time.perf_counter() - start
+    stopEvent.set()
+    return elapsed, await lagTask
+
+async def main():
+    numQueries = 4
+
+    blockingTime, blockingLag = await runSlowQueries(True, numQueries)
+    executorTime, executorLag = await runSlowQueries(False, numQueries)
+    shutdownDatabaseExecutor()
+    pool.closeAll()
+
+    print(f"Slow queries: {numQueries}")
+    print(f"Called directly:   total {blockingTime:.2f} seconds, max event loop lag {blockingLag:.4f} seconds")
+    print(f"Through executor:  total {executorTime:.2f} seconds, max event loop lag {executorLag:.4f} seconds")
+
+    # The loop must keep waking up on time while the queries run on the executor
+    assert executorLag < 0.1, f"Event loop blocked for {executorLag:.4f} seconds"
+    print("Event loop stayed responsive")
+
+if __name__ == "__main__":
+    asyncio.run(main())
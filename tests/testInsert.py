@@ -9,7 +9,8 @@ cursor = conn.cursor()
 
 # Definir a query de INSERT
 insert_query = """
-INSERT INTO session VALUES (?, 'testName2', 'testTeacher2', 'testDescription2', '18-03-2025', '16h', 100, 0);
+INSERT INTO session (sessionId, name, teacher, description, date, hour, spots, isActive)
+VALUES (?, 'testName2', 'testTeacher2', 'testDescription2', '18-03-2025', '16h', 100, 0);
 """
 
 # Inicializar variáveis para medição de tempo
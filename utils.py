@@ -12,6 +12,8 @@ import os
 from databaseDataInsert import *
 from dataModels import *
 from databaseDataSelect import *
+from databaseAsync import *
+from databaseSampleBuffer import *
 from emailSender import *
 
 # LOGIN #
@@ -180,20 +182,49 @@ def getSession(sessionId: str):
 
 # SEND SUMMARY #
 
-def sendSessionSummaryData(sessionId, username, measurements, hrv):
+def sendSessionSummaryData(sessionId, username, measurements, hrv, aggregate=None):
     """
     Saves the summary data for a session.
 
+    The summary is computed from the uploaded measurements or, when there are none, taken from the
+    running aggregate the server kept while the samples arrived.
+
     Parameters:
         sessionId (str): The ID of the session.
         username (str): The username of the user.
-        measurements (list): A list of heart rate measurements.
-        hrv (float): The heart rate variability.
+        measurements (list): A list of heart rate measurements, possibly empty.
+        hrv (float): The heart rate variability, or None to keep the last value received.
+        aggregate (RunningAggregate, optional): The server-side aggregate of the user in the session.
+
+    Returns:
+        bool: True if the summary was saved, False if there was nothing to summarize or the write failed.
 
     Example:
         sendSessionSummaryData("1", "example123", [70, 80, 90], 50.0)
     """
-    addToSessionSummary(sessionId, username, len(measurements), int(average(measurements)), max(measurements), min(measurements), hrv)
+    if measurements:
+        return addToSessionSummary(sessionId, username, len(measurements), int(average(measurements)), max(measurements), min(measurements), hrv)
+    if aggregate is not None and aggregate.count:
+        return addSessionSummaries([aggregate.toSummaryRow(sessionId, username, hrv)])
+    return False
+
+def saveSessionAggregates(sessionId, aggregates, replace=True):
+    """
+    Writes the summaries of the users of a session from their server-side aggregates.
+
+    Parameters:
+        sessionId (str): The ID of the session.
+        aggregates (dict): RunningAggregate objects by username.
+        replace (bool): Whether the summaries replace the ones already stored.
+
+    Returns:
+        bool: True if at least one summary was saved, False otherwise.
+
+    Example:
+        saveSessionAggregates("1", sessionAggregates.popSession("1"))
+    """
+    summaries = [aggregate.toSummaryRow(sessionId, username) for username, aggregate in aggregates.items() if aggregate.count]
+    return bool(summaries) and addSessionSummaries(summaries, replace)
 
 def average(arr):
     """